@@ -0,0 +1 @@
+"""Transformer models for sparse-reward games (Rubik's cube, Sudoku): data generation, fine-tuning and evaluation."""
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""Entry point for `python -m sparse_rewards`."""
+
+from sparse_rewards.cli import main
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
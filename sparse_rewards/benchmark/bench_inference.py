@@ -0,0 +1,156 @@
+"""Benchmark latency and tokens/sec of generation from a frozen export against gpt2.generate, and check accuracy parity.
+
+Both paths decode the same prompts greedily by default (--top_k 1), so differences in their responses come from the
+export's weight quantization. Responses of each path are scored with the evaluator of the game.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from sparse_rewards.model.frozen import FrozenModel
+from sparse_rewards.model.model_utils import CHECKPOINT_DIR, bucket_batches
+from sparse_rewards.model.sweep import evaluate_responses, summarize_checkpoint
+from sparse_rewards.utils.data_utils import line_pattern, parse_line
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Benchmark generation from a frozen export against gpt2.generate.")
+    parser.add_argument("--run_name", help="Name of the model run the export was made from.", required=True)
+    parser.add_argument("--export", help="Directory of the frozen export to benchmark (e.g. export/run1_int8).", required=True)
+    parser.add_argument("--data", required=True,
+        help="File containing lines in the format <|startoftext|>[WP] (prompt)[RESPONSE](response)<|endoftext|>; responses are used as references.")
+    parser.add_argument("--game", choices=["rubiks", "sudoku"], default="rubiks", help="Game of the data, which selects the evaluator (default rubiks).")
+    parser.add_argument("--n_examples", type=int, default=20, help="Number of prompts to generate responses for (default 20).")
+    parser.add_argument("--batch_size", type=int, default=8, help="Number of prompts decoded at once from the export (default 8).")
+    parser.add_argument("--length", type=int, default=512, help="Maximum number of tokens to generate per prompt (default 512).")
+    parser.add_argument("--top_k", type=int, default=1, help="Sample from the top k tokens only; 1 decodes greedily (default 1).")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--skip_baseline", action="store_true", help="Only benchmark the export, e.g. to compare exports with each other.")
+    parser.add_argument("--output", default="bench_inference.json", help="Name of file to write results to in JSON format (default bench_inference.json).")
+    parser.add_argument("--prompt_start", help="Token indicating start of prompt (default <|startoftext|>[WP]).", default="<|startoftext|>[WP]")
+    parser.add_argument("--response_start", help="Token indicating start of response (default [RESPONSE]).", default="[RESPONSE]")
+    parser.add_argument("--response_end", help="Token indicating end of response (default <|endoftext|>).", default="<|endoftext|>")
+    add_profiling_args(parser)
+    return parser
+
+
+def latency_stats(latencies, n_tokens, total_s):
+    """Summarize per-prompt latencies (seconds) and throughput of a generation path."""
+
+    latencies = np.asarray(latencies)
+    return {
+        "prompts": len(latencies),
+        "total_s": total_s,
+        "latency_mean_s": float(latencies.mean()),
+        "latency_p50_s": float(np.percentile(latencies, 50)),
+        "latency_p95_s": float(np.percentile(latencies, 95)),
+        "tokens": n_tokens,
+        "tokens_per_s": n_tokens / total_s if total_s > 0 else None,
+    }
+
+
+def main(args=None):
+    """Generate responses with both paths, then compare speed and accuracy."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("bench_inference", args)
+
+    with profiler.stage("read_data"):
+        with open(args.data, 'r') as file:
+            lines = [line.strip() for line in file.readlines() if line.strip()][:args.n_examples]
+        pattern = line_pattern(args.prompt_start, args.response_start, args.response_end)
+        pairs = [parse_line(line, pattern) for line in lines]
+        prompts = [line.split(args.response_start)[0] + args.response_start for line in lines]
+
+    def truncate(text):
+        """Cut a continuation at the response end token and strip it to the response."""
+
+        return text.split(args.response_end)[0].strip()
+
+    results = {}
+    responses = {}
+
+    # Frozen export: batches of equal-length prompts with the key/value cache kept in the graph, and early stopping
+    with profiler.stage("export_load"):
+        start = time.perf_counter()
+        frozen = FrozenModel(args.export)
+        load_s = time.perf_counter() - start
+    contexts = [frozen.encoder.encode(prompt) for prompt in prompts]
+    texts = [None] * len(prompts)
+    latencies = []
+    n_tokens = 0
+    start = time.perf_counter()
+    for indices in bucket_batches([len(context) for context in contexts], args.batch_size):
+        batch_start = time.perf_counter()
+        with profiler.stage("export_decode", items=len(indices)):
+            batch_texts = frozen.generate([contexts[i] for i in indices], args.length, args.temperature, args.top_k,
+                stop=args.response_end)
+        # Every prompt in a batch waits for the whole batch
+        latencies.extend([time.perf_counter() - batch_start] * len(indices))
+        # Count every token decoded, as for the baseline, including those sampled after a row has stopped
+        n_tokens += frozen.n_decoded
+        for i, text in zip(indices, batch_texts):
+            texts[i] = text
+    total_s = time.perf_counter() - start
+    results["export"] = latency_stats(latencies, n_tokens, total_s)
+    results["export"]["load_s"] = load_s
+    responses["export"] = [truncate(text) for text in texts]
+
+    # Current path: gpt2.generate one prompt at a time, decoding a fixed number of tokens
+    if not args.skip_baseline:
+        with profiler.stage("baseline_load"):
+            import gpt_2_simple as gpt2
+
+            start = time.perf_counter()
+            sess = gpt2.start_tf_sess()
+            gpt2.load_gpt2(sess, run_name=args.run_name, checkpoint_dir=CHECKPOINT_DIR)
+            load_s = time.perf_counter() - start
+        texts = []
+        latencies = []
+        start = time.perf_counter()
+        for prompt in prompts:
+            prompt_start = time.perf_counter()
+            with profiler.stage("baseline_decode", items=1):
+                text = gpt2.generate(sess, run_name=args.run_name, checkpoint_dir=CHECKPOINT_DIR, prefix=prompt, length=args.length,
+                    temperature=args.temperature, top_k=args.top_k, return_as_list=True)[0]
+            latencies.append(time.perf_counter() - prompt_start)
+            texts.append(text[len(prompt):] if text.startswith(prompt) else text)
+        total_s = time.perf_counter() - start
+        # gpt2.generate always decodes length tokens (capped by the context size) for each prompt
+        n_tokens = sum(min(args.length, frozen.hparams["n_ctx"] - 1 - len(context)) for context in contexts)
+        results["baseline"] = latency_stats(latencies, n_tokens, total_s)
+        results["baseline"]["load_s"] = load_s
+        responses["baseline"] = [truncate(text) for text in texts]
+
+    # Accuracy of each path, and agreement between them
+    with profiler.stage("evaluate"):
+        boards = [prompt for prompt, _ in pairs]
+        references = [reference for _, reference in pairs]
+        for path, path_responses in responses.items():
+            summary = summarize_checkpoint(args.game, evaluate_responses(args.game, boards, path_responses, references))
+            results[path]["accuracy"] = {key: float(value) for key, value in summary.items()}
+        if "baseline" in responses:
+            results["agreement"] = float(np.mean([a == b for a, b in zip(responses["export"], responses["baseline"])]))
+
+    for path in responses:
+        result = results[path]
+        print(f"{path}: {result['latency_mean_s']:.3f}s mean latency, {result['latency_p95_s']:.3f}s p95, "
+            f"{result['tokens_per_s']:.1f} tokens/s, correct {result['accuracy']['correct']:.3f}")
+    if "agreement" in results:
+        print(f"Identical responses: {results['agreement']:.3f}")
+
+    with open(args.output, 'w') as file:
+        json.dump({"export": args.export, "run_name": args.run_name, "results": results}, file, indent=4)
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""Benchmark the data, solver and evaluation hot paths on fixed corpora and compare against a stored baseline."""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from sparse_rewards.utils.data_utils import line_pattern, parse_line
+
+# Fixed corpora and seed used by every benchmark, relative to the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RUBIKS_DATA = os.path.join(REPO_ROOT, "data/rubiks/processed/rubiks_generated_test.txt")
+RUBIKS_RAW = os.path.join(REPO_ROOT, "data/rubiks/raw/rubiks_2.txt")
+RUBIKS_MODEL_OUTPUT = os.path.join(REPO_ROOT, "data/rubiks/processed/rubiks_responses_gen_short_1-277.txt")
+SUDOKU_DATA = os.path.join(REPO_ROOT, "data/sudoku/processed/sudoku_test_1.txt")
+SEED = 0
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "sparse_rewards/benchmark/baseline.json")
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Benchmark data, solver and evaluation hot paths.")
+    parser.add_argument("--only", nargs="+", default=None, help="Names of benchmarks to run (default: all).")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per benchmark; the best run is reported (default 3).")
+    parser.add_argument("--min_time", type=float, default=0.5,
+        help="Minimum duration of each timed run in seconds; fast benchmarks are called repeatedly until it is reached (default 0.5).")
+    parser.add_argument("--output", default="bench_results.json", help="Name of file to write results to in JSON format (default bench_results.json).")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline results to compare against (default sparse_rewards/benchmark/baseline.json).")
+    parser.add_argument("--save_baseline", action="store_true", help="Overwrite --baseline with the results of this run.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+        help="Report a regression when throughput drops by more than this fraction of the baseline (default 0.2). Benchmarks which \
+            vary most between runs use a larger threshold of their own.")
+    return parser
+
+
+def read_lines(path, n):
+    """Return the first n non-empty lines of a text file."""
+
+    with open(path, 'r') as file:
+        lines = [line for line in file.readlines() if line.strip()]
+    return lines[:n]
+
+
+def read_pairs(path, n):
+    """Return the (prompt, response) pairs of the first n non-empty lines of a text file."""
+
+    pattern = line_pattern()
+    return [parse_line(line, pattern) for line in read_lines(path, n)]
+
+
+def bench_config_to_cube():
+    from sparse_rewards.utils.rubiks_utils import config_to_cube
+
+    prompts = [prompt for prompt, _ in read_pairs(RUBIKS_DATA, 200)]
+    return (lambda: [config_to_cube(prompt) for prompt in prompts]), len(prompts)
+
+
+def bench_cube_to_config():
+    from sparse_rewards.utils.rubiks_utils import config_to_cube, cube_to_config
+
+    cubes = [config_to_cube(prompt) for prompt, _ in read_pairs(RUBIKS_DATA, 200)]
+    return (lambda: [cube_to_config(cube) for cube in cubes]), len(cubes)
+
+
+def bench_is_correct():
+    from sparse_rewards.utils.rubiks_utils import config_to_cube, is_correct
+
+    # Half of the cubes are solved by their response, half are left scrambled
+    cubes = []
+    for i, (prompt, response) in enumerate(read_pairs(RUBIKS_DATA, 200)):
+        cube = config_to_cube(prompt)
+        if i % 2 == 0:
+            cube(response)
+        cubes.append(cube)
+    return (lambda: [is_correct(cube) for cube in cubes]), len(cubes)
+
+
+def bench_gen_response():
+    from sparse_rewards.utils.rubiks_utils import config_to_cube, gen_response
+
+    prompts = [prompt for prompt, _ in read_pairs(RUBIKS_DATA, 5)]
+    return (lambda: [gen_response(config_to_cube(prompt)) for prompt in prompts]), len(prompts)
+
+
+def bench_eval_line():
+    from sparse_rewards.utils.rubiks_utils import eval_line
+
+    # Parsing is timed along with evaluation, as in eval rubiks
+    lines = read_lines(RUBIKS_MODEL_OUTPUT, 50)
+    pattern = line_pattern()
+    return (lambda: [eval_line(*parse_line(line, pattern)) for line in lines]), len(lines)
+
+
+def bench_eval_bulk():
+    from sparse_rewards.model.eval_rubiks_output import evaluate
+
+    pairs = read_pairs(RUBIKS_MODEL_OUTPUT, 277)
+    prompts = [prompt for prompt, _ in pairs]
+    responses = [response for _, response in pairs]
+    return (lambda: evaluate(prompts, responses)), len(pairs)
+
+
+def bench_validate_dataset():
+    from sparse_rewards.data.validate_rubiks_data import validate_lines
+
+    lines = [line.rstrip("\n") for line in read_lines(RUBIKS_RAW, 50)]
+    return (lambda: validate_lines(lines, "|")), len(lines)
+
+
+def bench_generate_dataset():
+    from sparse_rewards.utils.rubiks_utils import gen_sample
+
+    lengths = [1, 2, 5, 10, 20]
+    return (lambda: [gen_sample(length) for length in lengths]), len(lengths)
+
+
+def bench_sudoku_check_boards():
+    from sparse_rewards.model.eval_sudoku_output import load_boards
+    from sparse_rewards.utils.sudoku_utils import check_boards
+
+    prompts, responses, _ = load_boards(read_lines(SUDOKU_DATA, 16000), line_pattern())
+    return (lambda: check_boards(prompts, responses)), len(prompts)
+
+
+def bench_sudoku_eval_boards():
+    from sparse_rewards.model.eval_sudoku_output import load_boards, eval_boards
+
+    # Evaluation without a reference (checks and cell conflicts), as done by eval sudoku by default
+    prompts, responses, valid = load_boards(read_lines(SUDOKU_DATA, 16000), line_pattern())
+    return (lambda: eval_boards(prompts, responses, valid)), len(prompts)
+
+
+def bench_sudoku_generate():
+    from sparse_rewards.utils.sudoku_utils import generate_solution, generate_puzzle
+
+    def run():
+        rng = random.Random(SEED)
+        return [generate_puzzle(generate_solution(rng), 25, rng) for _ in range(20)]
+    return run, 20
+
+
+# Each benchmark builds its inputs from the fixed corpora and returns (fn, n_items); only calls to fn are timed
+BENCHMARKS = {
+    "config_to_cube": bench_config_to_cube,
+    "cube_to_config": bench_cube_to_config,
+    "is_correct": bench_is_correct,
+    "gen_response": bench_gen_response,
+    "eval_line": bench_eval_line,
+    "eval_bulk": bench_eval_bulk,
+    "validate_dataset": bench_validate_dataset,
+    "generate_dataset": bench_generate_dataset,
+    "sudoku_check_boards": bench_sudoku_check_boards,
+    "sudoku_eval_boards": bench_sudoku_eval_boards,
+    "sudoku_generate": bench_sudoku_generate,
+}
+# Regression thresholds for benchmarks which vary most between runs: pycuber object code and the solvers vary by 30-50%
+# on a shared single-CPU host even when timed for several seconds; the others use --threshold
+THRESHOLDS = {
+    "config_to_cube": 0.4,
+    "cube_to_config": 0.4,
+    "is_correct": 0.4,
+    "gen_response": 0.4,
+    "eval_line": 0.4,
+    "generate_dataset": 0.4,
+    "sudoku_generate": 0.4,
+}
+
+
+def run_benchmark(setup, repeat=3, min_time=0.5):
+    """Time a benchmark repeat times with a fixed seed.
+
+    Each timed run calls fn until at least min_time seconds have passed (as timeit.autorange does), so that benchmarks
+    taking a few milliseconds are not dominated by timer resolution and scheduling noise.
+
+    Returns:
+        Dict with number of items per call, calls per run, best and median time per call in seconds, and items per
+        second for the best run.
+    """
+
+    random.seed(SEED)
+    fn, n_items = setup()
+    times = []
+    for _ in range(repeat):
+        calls = 0
+        elapsed = 0.0
+        while calls == 0 or elapsed < min_time:
+            random.seed(SEED)
+            start = time.perf_counter()
+            fn()
+            elapsed += time.perf_counter() - start
+            calls += 1
+        times.append(elapsed / calls)
+    best = min(times)
+    return {
+        "items": n_items,
+        "calls": calls,
+        "best_s": best,
+        "median_s": statistics.median(times),
+        "items_per_s": n_items / best,
+    }
+
+
+def compare(results, baseline, threshold=0.2):
+    """Print throughput relative to the baseline for every benchmark present in both.
+
+    Returns:
+        List of names of benchmarks whose throughput regressed by more than threshold (a fraction of the baseline), or
+        by more than their entry in THRESHOLDS if that is larger.
+    """
+
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name}: {result['items_per_s']:.1f} items/s (no baseline)")
+            continue
+        ratio = result["items_per_s"] / baseline[name]["items_per_s"]
+        flag = ""
+        if ratio < 1.0 - max(threshold, THRESHOLDS.get(name, 0.0)):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name}: {result['items_per_s']:.1f} items/s ({ratio:.2f}x baseline){flag}")
+    return regressions
+
+
+def main(args=None):
+    if args is None:
+        args = build_parser().parse_args()
+
+    names = args.only if args.only is not None else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        print(f"Running {name}...")
+        results[name] = run_benchmark(BENCHMARKS[name], args.repeat, args.min_time)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+            "seed": SEED,
+        },
+        "results": results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=4)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+    else:
+        compare(results, {})
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=4)
+        print(f"Saved baseline to {args.baseline}.")
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""Unified command line interface: python -m sparse_rewards <command> [<game>] [options], or sparse-rewards once installed.
+
+Only the module of the command being run is imported, and heavy dependencies (TensorFlow, gpt-2-simple, pycuber) are
+only imported inside the commands that need them, so data-only commands and --help start quickly.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+# Command name -> (help, module), or (help, {game: (help, module)}) for commands with a separate module per game
+COMMANDS = {
+    "generate-data": ("Generate prompt-response training data.", {
+        "rubiks": ("Generate Rubik's scramble-solution pairs.", "sparse_rewards.data.generate_rubiks_data"),
+        "sudoku": ("Generate Sudoku puzzle-solution pairs.", "sparse_rewards.data.generate_sudoku_data"),
+    }),
+    "validate": ("Remove Rubik's scramble-solution pairs which do not solve the cube.", "sparse_rewards.data.validate_rubiks_data"),
+    "split": ("Split a text data file into train and test files.", "sparse_rewards.data.train_test_split"),
+    "finetune": ("Download or load GPT-2 and fine-tune it on a text data file.", "sparse_rewards.model.finetune"),
+    "generate": ("Generate responses to prompts with a fine-tuned model.", "sparse_rewards.model.generate"),
+    "eval": ("Evaluate model output.", {
+        "rubiks": ("Evaluate model output on Rubik's data.", "sparse_rewards.model.eval_rubiks_output"),
+        "sudoku": ("Evaluate model output on Sudoku data.", "sparse_rewards.model.eval_sudoku_output"),
+    }),
+    "sweep": ("Evaluate every saved checkpoint of a run on a fixed test subset.", "sparse_rewards.model.sweep"),
+    "attention": ("Extract attention maps of a fine-tuned model for a file of prompt-response pairs.", "sparse_rewards.model.extract_attention"),
+    "export": ("Export a fine-tuned checkpoint as a frozen, optionally quantized, inference graph.", "sparse_rewards.model.export"),
+    "gif": ("Create a GIF of a Rubik's formula being applied to a cube.", "sparse_rewards.utils.rubiks_formula_to_gif"),
+    "benchmark": ("Benchmark data, solver and evaluation hot paths.", "sparse_rewards.benchmark.run_benchmarks"),
+    "benchmark-inference": ("Benchmark generation from a frozen export against gpt2.generate.", "sparse_rewards.benchmark.bench_inference"),
+}
+
+
+def add_command_args(parser, module_name):
+    """Import a command module and add its arguments and entry point to parser."""
+
+    module = importlib.import_module(module_name)
+    module.build_parser(parser)
+    parser.set_defaults(main=module.main)
+
+
+def build_parser(argv):
+    """Build the command line parser, importing only the module of the command selected in argv."""
+
+    # Installed as a console script the program is named after the script, otherwise it is run with python -m sparse_rewards
+    prog = os.path.basename(sys.argv[0])
+    parser = argparse.ArgumentParser(prog="python -m sparse_rewards" if prog == "__main__.py" else prog, description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", metavar="command", required=True)
+    for name, (help, spec) in COMMANDS.items():
+        command_parser = commands.add_parser(name, help=help, description=help)
+        selected = argv[:1] == [name]
+        if isinstance(spec, dict):
+            games = command_parser.add_subparsers(dest="game", metavar="game", required=True)
+            for game, (game_help, module_name) in spec.items():
+                game_parser = games.add_parser(game, help=game_help, description=game_help)
+                if selected and argv[1:2] == [game]:
+                    add_command_args(game_parser, module_name)
+        elif selected:
+            add_command_args(command_parser, spec)
+    return parser
+
+
+def main(argv=None):
+    """Parse command line arguments and run the selected command."""
+
+    if argv is None:
+        argv = sys.argv[1:]
+    args = build_parser(argv).parse_args(argv)
+    args.main(args)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Generate Rubik's prompt-response pairs from random scrambles and their CFOP solutions."""
+
+import random
+import argparse
+import csv
+from math import ceil
+
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n_samples", type=int, help="Number of samples to generate (default 10000).", default=10000)
+    parser.add_argument("--min_length", type=int,
+        help="Minimum length (in face turns) of intial cube configurations. Note that lengths of generated samples will be uniformly \
+            distributed from --min_length to --max_length. Default is 1.", default=1)
+    parser.add_argument("--max_length", type=int,
+        help="Maximum length (in face turns) of intial cube configurations. Note that lengths of generated samples will be uniformly \
+            distributed from --min_length to --max_length. Default is 10.", default=10)
+    parser.add_argument("--output", help="Name of output file to write generated samples to. Default rubiks_generated.txt.", default="rubiks_generated.txt")
+    parser.add_argument("--scrambles", default=None,
+        help="Optional name of CSV file to write each sample's prompt, scramble formula and scramble length to, for per-scramble-length evaluation.")
+    parser.add_argument("--prompt_start", help="Token indicating start of prompt (default <|startoftext|>[WP]).", default="<|startoftext|>[WP]")
+    parser.add_argument("--response_start", help="Token indicating start of response (default [RESPONSE]).", default="[RESPONSE]")
+    parser.add_argument("--response_end", help="Token indicating end of response (default <|endoftext|>).", default="<|endoftext|>")
+    add_profiling_args(parser)
+    return parser
+
+
+def main(args=None):
+    """Generate Rubik's prompt-response pairs."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("generate_rubiks_data", args)
+
+    # pycuber is only needed once we start generating
+    with profiler.stage("import"):
+        from sparse_rewards.utils.rubiks_utils import gen_sample
+
+    # Config lengths are uniformly distributed by default from min_length to max_length
+    # Determine how many samples are required of each length
+    n_lengths = args.max_length - (args.min_length - 1)
+    samples_per_len = ceil(args.n_samples / n_lengths)
+
+    # Store generated samples, and the scramble that produced each one
+    gen_samples = []
+    scrambles = []
+
+    # Generate appropriate amount of samples for each sample length
+    for length in range(args.min_length, args.max_length+1):
+        for _ in range(samples_per_len):
+            prompt, response, config = gen_sample(length, profiler)
+            sample = f"{args.prompt_start}{prompt}{args.response_start}{response}{args.response_end}"
+            gen_samples.append(sample)
+            scrambles.append((prompt, config, length))
+
+    # Write generated samples to output file
+    with profiler.stage("write_output", items=len(gen_samples)):
+        with open(args.output, 'w') as file:
+            file.write("\n".join(gen_samples))
+        if args.scrambles is not None:
+            with open(args.scrambles, 'w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(["prompt", "scramble", "scramble_length"])
+                writer.writerows(scrambles)
+
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
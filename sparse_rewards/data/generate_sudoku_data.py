@@ -0,0 +1,133 @@
+"""Generate Sudoku puzzle-solution pairs with a unique solution, binned by number of givens or by difficulty."""
+
+import random
+import argparse
+from math import ceil
+from multiprocessing import Pool
+import os
+
+from sparse_rewards.utils.sudoku_utils import N_CELLS, generate_solution, generate_puzzle, solve
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+# Default --bins for each --bin_by, covering every puzzle the generator produces
+DEFAULT_BINS = {"givens": "17-81", "difficulty": "0-1000"}
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n_samples", type=int, help="Number of samples to generate (default 10000).", default=10000)
+    parser.add_argument("--bin_by", choices=["givens", "difficulty"], default="givens",
+        help="Quantity used to bin puzzles: 'givens' (number of filled cells in the puzzle) or 'difficulty' (number of guesses the \
+            backtracking solver needs). Samples are split evenly across bins. Default is givens.")
+    parser.add_argument("--bins", default=None,
+        help="Comma-separated list of inclusive ranges for --bin_by, e.g. '22-27,28-35,36-45' or '0-0,1-10,11-1000' (default 17-81 \
+            for givens and 0-1000 for difficulty).")
+    parser.add_argument("--min_givens", type=int, default=17,
+        help="Fewest givens to aim for when removing clues with --bin_by difficulty. Default is 17.")
+    parser.add_argument("--max_givens", type=int, default=45,
+        help="Most givens to aim for when removing clues with --bin_by difficulty. Targets are drawn uniformly from --min_givens to \
+            --max_givens. Default is 45.")
+    parser.add_argument("--max_attempts", type=int, default=100,
+        help="Give up on a bin after this many generated puzzles per requested sample fall outside it (default 100).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+        help="Number of worker processes (default: number of CPUs). Each worker generates roughly 225 puzzles/s with the default \
+            bins and 75 puzzles/s with --bins 22-27, so about 5 and 15 workers respectively are needed per million puzzles per hour.")
+    parser.add_argument("--chunk_size", type=int, default=250, help="Number of puzzles generated per worker task (default 250).")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed; output is reproducible for a fixed seed and chunk size.")
+    parser.add_argument("--split_bins", action="store_true", help="Also write each bin to its own file, <output>_<bin>.txt.")
+    parser.add_argument("--output", help="Name of output file to write generated samples to. Default sudoku_generated.txt.", default="sudoku_generated.txt")
+    parser.add_argument("--prompt_start", help="Token indicating start of prompt (default <|startoftext|>[WP]).", default="<|startoftext|>[WP]")
+    parser.add_argument("--response_start", help="Token indicating start of response (default [RESPONSE]).", default="[RESPONSE]")
+    parser.add_argument("--response_end", help="Token indicating end of response (default <|endoftext|>).", default="<|endoftext|>")
+    add_profiling_args(parser)
+    return parser
+
+
+def parse_bins(bins):
+    """Parse a string of comma-separated inclusive ranges ('lo-hi' or 'n') into a list of (lo, hi) tuples."""
+
+    ranges = []
+    for item in bins.split(","):
+        lo, _, hi = item.strip().partition("-")
+        ranges.append((int(lo), int(hi or lo)))
+    return ranges
+
+
+def gen_chunk(task):
+    """Generate puzzles for a single bin.
+
+    Args:
+        task: Tuple (seed, bin_by, lo, hi, n, min_givens, max_givens, max_attempts).
+
+    Returns:
+        List of (puzzle, solution) string pairs, possibly shorter than n if the bin could not be filled.
+    """
+
+    seed, bin_by, lo, hi, n, min_givens, max_givens, max_attempts = task
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n * max_attempts):
+        if len(samples) == n:
+            break
+        solution = generate_solution(rng)
+        if bin_by == "givens":
+            # Aim for a given count inside the bin; the puzzle may keep more if no further clue can be removed
+            puzzle = generate_puzzle(solution, rng.randint(lo, hi), rng)
+            value = N_CELLS - puzzle.count(0)
+        else:
+            puzzle = generate_puzzle(solution, rng.randint(min_givens, max_givens), rng)
+            value = solve(puzzle, 1)[2]
+        if lo <= value <= hi:
+            samples.append(("".join(map(str, puzzle)), "".join(map(str, solution))))
+    return samples
+
+
+def main(args=None):
+    """Generate Sudoku prompt-response pairs."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("generate_sudoku_data", args)
+
+    bins = parse_bins(args.bins if args.bins is not None else DEFAULT_BINS[args.bin_by])
+    # Determine how many samples are required in each bin and split them into tasks for the worker pool
+    samples_per_bin = ceil(args.n_samples / len(bins))
+    base_seed = args.seed if args.seed is not None else random.randrange(2**32)
+    tasks = []
+    for lo, hi in bins:
+        for start in range(0, samples_per_bin, args.chunk_size):
+            n = min(args.chunk_size, samples_per_bin - start)
+            tasks.append((base_seed + len(tasks), args.bin_by, lo, hi, n, args.min_givens, args.max_givens, args.max_attempts))
+
+    # Store generated samples per bin
+    gen_samples = {b: [] for b in bins}
+    with profiler.stage("generate"), Pool(args.workers) as pool:
+        # imap keeps results in task order so that a fixed seed gives identical output
+        for task, samples in zip(tasks, pool.imap(gen_chunk, tasks)):
+            lo, hi = task[2], task[3]
+            for puzzle, solution in samples:
+                gen_samples[(lo, hi)].append(f"{args.prompt_start} {puzzle}{args.response_start} {solution}{args.response_end}")
+            profiler.add_items("generate", len(samples))
+
+    for (lo, hi), samples in gen_samples.items():
+        print(f"{args.bin_by} {lo}-{hi}: {len(samples)}/{samples_per_bin} samples")
+        if len(samples) < samples_per_bin:
+            print(f"Warning: could not fill bin {lo}-{hi} within --max_attempts.")
+
+    # Write generated samples to output file(s)
+    with profiler.stage("write_output"):
+        with open(args.output, 'w') as file:
+            file.write("\n".join(sample for samples in gen_samples.values() for sample in samples))
+        if args.split_bins:
+            for (lo, hi), samples in gen_samples.items():
+                with open(args.output.replace(".txt", "") + f"_{lo}-{hi}.txt", 'w') as file:
+                    file.write("\n".join(samples))
+
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -3,16 +3,20 @@ Clean a text file of Rubik's cube solutions data by removing all scramble-soluti
 which do not resolve to a completed cube.
 """
 
-import pycuber as pc
 import argparse
 
-parser = argparse.ArgumentParser(description="Clean text Rubik's solution data.")
-parser.add_argument('--input', type=str, help="Path to input data file.")
-parser.add_argument('--output', type=str, help="Name of output file to write cleaned data to (default rubiks_clean.txt).", 
-  default="rubiks_clean.txt", required=False)
-parser.add_argument('--delim', type=str, help="Delimiter string used to separate prompt (cube scramble formula) from response (cube solution formula) (default '|').", 
-  default="|", required=False)
-args = parser.parse_args()
+
+def build_parser(parser=None):
+  """Add arguments for this command to parser (or to a new parser) and return it."""
+
+  if parser is None:
+    parser = argparse.ArgumentParser(description="Clean text Rubik's solution data.")
+  parser.add_argument('--input', type=str, help="Path to input data file.")
+  parser.add_argument('--output', type=str, help="Name of output file to write cleaned data to (default rubiks_clean.txt).", 
+    default="rubiks_clean.txt", required=False)
+  parser.add_argument('--delim', type=str, help="Delimiter string used to separate prompt (cube scramble formula) from response (cube solution formula) (default '|').", 
+    default="|", required=False)
+  return parser
 
 
 def is_correct(cube):
@@ -30,15 +34,15 @@ def is_correct(cube):
   return complete
 
 
-def main():
-  # Load input file specified by command line arg
-  with open(args.input, 'r') as file:
-    data = file.read()
-  
+def validate_lines(lines, delim="|"):
+  """Returns the lines whose response formula solves the cube scrambled by their prompt formula."""
+
+  import pycuber as pc
+
   output = []
   # Iterate through each line and append correct lines to output
-  for line in data.split("\n"):
-    split_line = line.split(args.delim)
+  for line in lines:
+    split_line = line.split(delim)
     prompt, response = split_line[0], split_line[1]
 
     # Create a new cube
@@ -50,6 +54,18 @@ def main():
     # Ensure resulting cube is correct (i.e., response is correct formula for solving scramble specified by prompt)
     if is_correct(cube):
       output.append(line)
+  return output
+
+
+def main(args=None):
+  if args is None:
+    args = build_parser().parse_args()
+
+  # Load input file specified by command line arg
+  with open(args.input, 'r') as file:
+    data = file.read()
+  
+  output = validate_lines(data.split("\n"), args.delim)
     
   # Join output lines with newline and print to output file
   output_str = "\n".join(output)
@@ -57,4 +73,4 @@ def main():
     file.write(output_str)
 
 if __name__ == "__main__":
-  main()
+  main()
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""Given file with Rubik's output, test model performance."""
+
+import argparse
+import csv
+from itertools import takewhile
+
+import numpy as np
+
+from sparse_rewards.utils.data_utils import line_pattern, parse_line
+from sparse_rewards.utils.facelets import configs_to_array, encode_formulas, apply_moves, correct_facelets, is_solved, is_move, N_FACELETS
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+RESULTS = ["Correct", "Incorrect", "Invalid"]
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model_output", help="Path to file containing Rubik's data and corresponding model output.")
+    parser.add_argument("--reference", default=None,
+        help="Optional path to file of reference prompt-solution pairs (e.g. the test data used for generation), matched to model output by \
+            prompt. Enables reference length and longest matching prefix metrics.")
+    parser.add_argument("--scrambles", default=None,
+        help="Optional CSV with prompt and scramble_length columns (see generate-data rubiks --scrambles), matched by prompt. \
+            Used to break results down by scramble length; otherwise they are broken down by reference solution length if available.")
+    parser.add_argument("--prompt_start", help="Token indicating start of prompt (default <|startoftext|>[WP]).", default="<|startoftext|>[WP]")
+    parser.add_argument("--response_start", help="Token indicating start of response (default [RESPONSE]).", default="[RESPONSE]")
+    parser.add_argument("--response_end", help="Token indicating end of response (default <|endoftext|>).", default="<|endoftext|>")
+    parser.add_argument("--format", choices=["csv", "parquet", "json"], default="csv",
+        help="Format of the per-line results and summary tables (default csv). parquet requires pyarrow or fastparquet.")
+    parser.add_argument("--results", help="Name of output file to write per-line results to (default <--model_output>_results.<format>).", default=None)
+    parser.add_argument("--summary", help="Name of output file to write the summary table to (default <--model_output>_summary.<format>).", default=None)
+    add_profiling_args(parser)
+    return parser
+
+
+def eval_with_pycuber(prompt, response):
+    """Evaluate a pair containing moves the facelet model does not support (e.g. slices or rotations) with pycuber.
+
+    Returns:
+        A tuple (result, correct_facelets) as for evaluate(); correct_facelets is None if the response is invalid.
+    """
+
+    from sparse_rewards.utils.rubiks_utils import config_to_cube, cube_to_config, eval_line
+
+    result = eval_line(prompt, response)
+    if result == "Invalid":
+        return result, None
+    cube = config_to_cube(prompt)
+    cube(response)
+    states, _ = configs_to_array([cube_to_config(cube)])
+    return result, int(correct_facelets(states)[0])
+
+
+def prefix_matches(moves, limits, reference_moves, reference_limits):
+    """Return the number of leading moves of each formula which match the reference formula, given padded move arrays."""
+
+    width = min(moves.shape[1], reference_moves.shape[1])
+    limit = np.minimum(limits, reference_limits)
+    equal = (moves[:, :width] == reference_moves[:, :width]) & (np.arange(width) < limit[:, None])
+    return np.cumprod(equal, axis=1).sum(axis=1)
+
+
+def evaluate(prompts, responses, references=None):
+    """Evaluate prompt-response pairs in bulk.
+
+    Args:
+        prompts: List of initial configuration strings (None for lines which could not be parsed).
+        responses: List of response formulas (None for lines which could not be parsed).
+        references: Optional list of reference formulas for the same prompts (None where unknown).
+
+    Returns:
+        A pandas DataFrame with one row per pair and columns prompt, response, result ("Correct", "Incorrect" or "Invalid",
+        as returned by eval_line), response_length, valid_prefix (leading moves which could be applied),
+        correct_facelets (facelets matching their face centre after applying the response, or its valid prefix) and,
+        with references, reference_length, reference_prefix (leading moves matching the reference) and length_ratio.
+    """
+
+    import pandas as pd
+
+    states, prompt_ok = configs_to_array(prompts)
+    moves, lengths, valid_prefix = encode_formulas(responses)
+    final = apply_moves(states, moves)
+    facelets = correct_facelets(final).astype(float)
+    solved = is_solved(final)
+
+    has_response = np.array([bool(response) for response in responses], dtype=bool)
+    supported = valid_prefix == lengths
+    results = np.where(solved, "Correct", "Incorrect").astype(object)
+    results[~(prompt_ok & has_response)] = "Invalid"
+    facelets[~prompt_ok] = np.nan
+
+    # Responses containing tokens pycuber cannot parse are invalid; fall back to pycuber for the (rare) responses which
+    # use moves other than face turns
+    for i in np.flatnonzero(prompt_ok & has_response & ~supported):
+        if not all(is_move(token) for token in responses[i].split()):
+            results[i] = "Invalid"
+            continue
+        result, n_correct = eval_with_pycuber(prompts[i], responses[i])
+        results[i] = result
+        if n_correct is not None:
+            facelets[i] = n_correct
+            valid_prefix[i] = lengths[i]
+
+    df = pd.DataFrame({
+        "prompt": prompts,
+        "response": responses,
+        "result": results,
+        "response_length": lengths,
+        "valid_prefix": valid_prefix,
+        "correct_facelets": facelets,
+    })
+
+    if references is not None:
+        known = np.array([reference is not None for reference in references], dtype=bool)
+        reference_moves, reference_lengths, reference_valid = encode_formulas(references)
+        matched = prefix_matches(moves, valid_prefix, reference_moves, reference_valid)
+        # Moves the facelet model does not encode are compared as tokens
+        for i in np.flatnonzero(known & has_response & (~supported | (reference_valid < reference_lengths))):
+            matched[i] = sum(1 for _ in takewhile(lambda pair: pair[0] == pair[1], zip(responses[i].split(), references[i].split())))
+        df["reference_length"] = np.where(known, reference_lengths, np.nan)
+        df["reference_prefix"] = np.where(known, matched, np.nan)
+        df["length_ratio"] = df["response_length"] / df["reference_length"].replace(0, np.nan)
+    return df
+
+
+def summarize(df, by=None):
+    """Aggregate per-line results into a summary table, overall and optionally broken down by the column named by.
+
+    Returns:
+        A pandas DataFrame with one row per group (the first row, labelled "all", covers every line) holding the number of
+        lines, fraction correct/incorrect/invalid, mean correct facelets and response length and, where available, mean
+        reference prefix and mean length ratio of correct responses to the reference. The index is named by_<by>, so it
+        does not clash with the reference_length column when grouping by reference length.
+    """
+
+    import pandas as pd
+
+    df = df.assign(
+        correct=df["result"] == "Correct",
+        incorrect=df["result"] == "Incorrect",
+        invalid=df["result"] == "Invalid",
+        solved_fraction=df["correct_facelets"] / N_FACELETS,
+    )
+    columns = {
+        "n": ("result", "size"),
+        "correct": ("correct", "mean"),
+        "incorrect": ("incorrect", "mean"),
+        "invalid": ("invalid", "mean"),
+        "correct_facelets": ("correct_facelets", "mean"),
+        "solved_fraction": ("solved_fraction", "mean"),
+        "response_length": ("response_length", "mean"),
+    }
+    if "reference_length" in df:
+        df = df.assign(length_ratio_correct=df["length_ratio"].where(df["correct"]))
+        columns["reference_length"] = ("reference_length", "mean")
+        columns["reference_prefix"] = ("reference_prefix", "mean")
+        columns["length_ratio_correct"] = ("length_ratio_correct", "mean")
+
+    overall = df.assign(group="all").groupby("group").agg(**columns)
+    if by is None:
+        return overall
+    # Lines with no value for by (e.g. prompts missing from the scrambles file) are kept as their own group
+    groups = df.groupby(by, dropna=False).agg(**columns)
+    groups.index = groups.index.map(lambda value: str(int(value)) if isinstance(value, float) and value.is_integer() else str(value))
+    return pd.concat([overall, groups]).rename_axis(f"by_{by}")
+
+
+def read_pairs(path, prompt_start, response_start, response_end):
+    """Read a file of prompt-response lines.
+
+    Returns:
+        A tuple of lists (prompts, responses), with None for lines which could not be parsed.
+    """
+
+    pattern = line_pattern(prompt_start, response_start, response_end)
+    with open(path, 'r') as file:
+        lines = [line for line in file.readlines()]
+    pairs = [parse_line(line, pattern) for line in lines]
+    return [prompt for prompt, _ in pairs], [response for _, response in pairs]
+
+
+def read_scramble_lengths(path):
+    """Read a CSV with prompt and scramble_length columns into a dict mapping prompt to scramble length."""
+
+    with open(path, 'r', newline='') as file:
+        return {row["prompt"]: int(row["scramble_length"]) for row in csv.DictReader(file)}
+
+
+def write_table(df, path, format):
+    """Write a DataFrame to path as csv, parquet or json (records)."""
+
+    if format == "csv":
+        df.to_csv(path)
+    elif format == "parquet":
+        df.to_parquet(path)
+    else:
+        df.reset_index().to_json(path, orient="records")
+
+
+def main(args=None):
+    """Parse and evaluate model output on Rubik's data."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("eval_rubiks_output", args)
+
+    stem = args.model_output.replace(".txt", "")
+    results_file = args.results if args.results is not None else f"{stem}_results.{args.format}"
+    summary_file = args.summary if args.summary is not None else f"{stem}_summary.{args.format}"
+
+    with profiler.stage("parse"):
+        prompts, responses = read_pairs(args.model_output, args.prompt_start, args.response_start, args.response_end)
+        profiler.add_items("parse", len(prompts))
+
+        references = None
+        if args.reference is not None:
+            reference_prompts, reference_responses = read_pairs(args.reference, args.prompt_start, args.response_start,
+                args.response_end)
+            # Match by prompt (spaces ignored) so that the reference may be a superset of the model output or in a different order
+            by_prompt = {}
+            for prompt, response in zip(reference_prompts, reference_responses):
+                if prompt is not None:
+                    by_prompt.setdefault(prompt.replace(" ", ""), response)
+            references = [by_prompt.get(prompt.replace(" ", "")) if prompt else None for prompt in prompts]
+
+    with profiler.stage("evaluate", items=len(prompts)):
+        df = evaluate(prompts, responses, references)
+    df.index = np.arange(1, len(df) + 1)
+    df.index.name = "line"
+
+    by = None
+    if args.scrambles is not None:
+        lengths = read_scramble_lengths(args.scrambles)
+        df["scramble_length"] = [lengths.get(prompt.replace(" ", "")) if prompt else None for prompt in df["prompt"]]
+        by = "scramble_length"
+    elif references is not None:
+        by = "reference_length"
+
+    with profiler.stage("summarize"):
+        summary = summarize(df, by)
+
+    # Print number and percentage of correct, incorrect, and invalid responses
+    total = len(df)
+    print(f"Evaluating responses from {args.model_output}.")
+    for result in RESULTS:
+        count = int((df["result"] == result).sum())
+        print(f"{result}: {count}/{total} ~ {float(count) / max(total, 1)}")
+    print(summary.to_string(float_format=lambda value: f"{value:.3f}"))
+
+    # Write per-line results and summary tables
+    with profiler.stage("write_results"):
+        write_table(df, results_file, args.format)
+        write_table(summary, summary_file, args.format)
+
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
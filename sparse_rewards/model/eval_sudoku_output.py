@@ -0,0 +1,140 @@
+"""Given file with Sudoku output, test model performance."""
+
+import argparse
+import numpy as np
+
+from sparse_rewards.model.eval_rubiks_output import write_table
+from sparse_rewards.utils.data_utils import line_pattern, parse_line
+from sparse_rewards.utils.sudoku_utils import strings_to_boards, check_boards, cell_conflicts, DIGIT_BITS
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model_output", help="Path to file containing Sudoku data and corresponding model output.", required=True)
+    parser.add_argument("--reference", help="Optional path to file of reference prompt-solution pairs (same order as --model_output) used for per-cell accuracy. \
+        If not specified, a cell counts as accurate when it does not conflict with a given or with any other cell in its row, column or box.", default=None)
+    parser.add_argument("--prompt_start", help="Token indicating start of prompt (default <|startoftext|>[WP]).", default="<|startoftext|>[WP]")
+    parser.add_argument("--response_start", help="Token indicating start of response (default [RESPONSE]).", default="[RESPONSE]")
+    parser.add_argument("--response_end", help="Token indicating end of response (default <|endoftext|>).", default="<|endoftext|>")
+    parser.add_argument("--format", choices=["csv", "parquet", "json"], default="csv",
+        help="Format of the per-line results and summary tables (default csv). parquet requires pyarrow or fastparquet.")
+    parser.add_argument("--results", help="Name of output file to write per-line results to (default <--model_output>_results.<format>).", default=None)
+    parser.add_argument("--summary", help="Name of output file to write the summary table to (default <--model_output>_summary.<format>).", default=None)
+    parser.add_argument("--batch_size", type=int, help="Number of boards to check at once (default 65536).", default=65536)
+    add_profiling_args(parser)
+    return parser
+
+
+def load_boards(lines, pattern):
+    """Parse lines of model output into prompt and response boards.
+
+    Returns:
+        A tuple (prompts, responses, valid) of two (N, 9, 9) arrays and an (N,) boolean array marking lines whose
+        prompt and response were both well-formed boards.
+    """
+
+    pairs = [parse_line(line, pattern) for line in lines]
+    prompts, prompts_ok = strings_to_boards([prompt for prompt, _ in pairs])
+    responses, responses_ok = strings_to_boards([response for _, response in pairs])
+    return prompts, responses, prompts_ok & responses_ok
+
+
+def eval_boards(prompts, responses, valid, solutions=None):
+    """Evaluate a batch of prompt-response board pairs.
+
+    Returns:
+        A tuple (results, cell_accuracy) where results is an (N,) array of "Correct", "Incorrect" or "Invalid" and
+        cell_accuracy is an (N,) array holding the fraction of accurate cells in each response (0 for invalid lines).
+    """
+
+    # Look up digit bits once for both the checker and the conflict detection
+    bits = DIGIT_BITS[responses]
+    solved = check_boards(prompts, responses, bits)["solved"] & valid
+    results = np.where(valid, np.where(solved, "Correct", "Incorrect"), "Invalid")
+
+    if solutions is not None:
+        accurate = responses == solutions
+    else:
+        accurate = ~cell_conflicts(responses, bits) & ((prompts == 0) | (prompts == responses))
+    cell_accuracy = np.where(valid, accurate.mean(axis=(1, 2)), 0.0)
+    return results, cell_accuracy
+
+
+def main(args=None):
+    """Parse and evaluate model output on Sudoku data."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("eval_sudoku_output", args)
+
+    stem = args.model_output.replace(".txt", "")
+    results_file = args.results if args.results is not None else f"{stem}_results.{args.format}"
+    summary_file = args.summary if args.summary is not None else f"{stem}_summary.{args.format}"
+    pattern = line_pattern(args.prompt_start, args.response_start, args.response_end)
+
+    with profiler.stage("read_data"):
+        with open(args.model_output, 'r') as file:
+            lines = [line for line in file.readlines() if line.strip()]
+
+    with profiler.stage("parse", items=len(lines)):
+        prompts, responses, valid = load_boards(lines, pattern)
+
+    solutions = None
+    if args.reference is not None:
+        with open(args.reference, 'r') as file:
+            reference_lines = [line for line in file.readlines() if line.strip()]
+        if len(reference_lines) < len(lines):
+            raise ValueError(f"{args.reference} has fewer lines than {args.model_output}.")
+        _, solutions, _ = load_boards(reference_lines[:len(lines)], pattern)
+
+    # Check boards in fixed-size batches to bound the memory used by the per-cell checks
+    results = []
+    cell_accuracy = []
+    profiler.add_items("evaluate", len(lines))
+    for start in range(0, len(lines), args.batch_size):
+        batch = slice(start, start + args.batch_size)
+        with profiler.stage("evaluate"):
+            batch_results, batch_accuracy = eval_boards(prompts[batch], responses[batch], valid[batch],
+                None if solutions is None else solutions[batch])
+        results.append(batch_results)
+        cell_accuracy.append(batch_accuracy)
+    results = np.concatenate(results) if results else np.array([], dtype=str)
+    cell_accuracy = np.concatenate(cell_accuracy) if cell_accuracy else np.array([])
+
+    # Print number and percentage of correct, incorrect, and invalid responses
+    total = len(results)
+    counts = {result: int((results == result).sum()) for result in ["Correct", "Incorrect", "Invalid"]}
+    mean_accuracy = float(cell_accuracy[valid].mean()) if valid.any() else 0.0
+
+    print(f"Evaluating responses from {args.model_output}.")
+    for result, count in counts.items():
+        print(f"{result}: {count}/{total} ~ {float(count) / max(total, 1)}")
+    print(f"Per-cell accuracy (valid responses): {mean_accuracy}")
+
+    # Per-line results indexed by line number, and a one-row summary laid out like the Rubik's summary table
+    import pandas as pd
+
+    df = pd.DataFrame({"result": results, "cell_accuracy": cell_accuracy},
+        index=pd.RangeIndex(1, total + 1, name="line"))
+    summary = pd.DataFrame({
+        "n": [total],
+        "correct": [counts["Correct"] / max(total, 1)],
+        "incorrect": [counts["Incorrect"] / max(total, 1)],
+        "invalid": [counts["Invalid"] / max(total, 1)],
+        "cell_accuracy": [mean_accuracy],
+    }, index=pd.Index(["all"], name="group"))
+
+    # Write per-line results and summary tables
+    with profiler.stage("write_results"):
+        write_table(df, results_file, args.format)
+        write_table(summary, summary_file, args.format)
+
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
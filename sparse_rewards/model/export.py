@@ -0,0 +1,243 @@
+"""Export a fine-tuned checkpoint as a frozen, optionally quantized, CPU inference graph which decodes with a cached past.
+
+The exported graph keeps the keys/values of all previous tokens in a variable inside the session, so each decoding step
+only runs the model on the newly sampled token and the cache never leaves the graph. Running the "start" op with a batch
+of contexts fills the cache; each run of the "tokens" output then samples --length further tokens in a tf.while_loop and
+stores the grown cache for the next run, so callers can decode in chunks and stop early.
+
+Weights are embedded in the graph as constants (int8 with per-channel scales, float16 or float32), so no checkpoint is
+needed to load it. The "init" op run when loading copies every weight matrix, dequantized, into a float32 variable, and
+decoding runs entirely in float32. Quantization therefore only shrinks the export on disk: decoding speed is unchanged,
+and a loaded int8 or float16 export uses somewhat more memory than a float32 one, since the session holds the quantized
+constants as well as the float32 variables. See sparse_rewards/model/frozen.py for generating from an export.
+"""
+
+import os
+import json
+import shutil
+import argparse
+
+import numpy as np
+
+from sparse_rewards.model.model_utils import CHECKPOINT_DIR, get_checkpoint_path, load_hparams
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+# Path to export locations, and files written to each export directory
+EXPORT_DIR = "export"
+GRAPH_FILE = "model.pb"
+META_FILE = "export.json"
+ENCODER_FILES = ["encoder.json", "vocab.bpe", "hparams.json"]
+# Names of the inputs, outputs and ops of the exported graph
+INPUTS = {"context": "context:0", "length": "length:0", "temperature": "temperature:0", "top_k": "top_k:0"}
+OUTPUTS = {"tokens": "tokens:0"}
+OPS = {"init": "init", "start": "start"}
+QUANTIZATIONS = ["int8", "float16", "float32"]
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Export a fine-tuned checkpoint as a frozen, optionally quantized, inference graph.")
+    parser.add_argument("--run_name", help="Name of existing model run to export.", required=True)
+    parser.add_argument("--checkpoint", default="latest", help="Checkpoint of the run to export, e.g. model-500 (default latest).")
+    parser.add_argument("--quantize", choices=QUANTIZATIONS, default="int8",
+        help="Precision of the weights stored in the graph file (default int8). This only reduces the size of the export on disk: \
+            weights are dequantized to float32 when the export is loaded, so decoding runs in float32 and uses somewhat more memory \
+            than a float32 export. Matrices are quantized per output channel; biases and layer norm parameters are always float32.")
+    parser.add_argument("--output", default=None, help="Name of directory to write the export to (default export/{run_name}_{quantize}).")
+    add_profiling_args(parser)
+    return parser
+
+
+def quantize(value, mode, channel_axis=-1):
+    """Quantize a weight array.
+
+    With int8, values are scaled symmetrically per channel along channel_axis so that the largest magnitude in each
+    channel maps to 127.
+
+    Returns:
+        A tuple (quantized, scale); scale is None unless mode is int8. dequantize() inverts this.
+    """
+
+    if mode == "float32":
+        return value.astype(np.float32), None
+    if mode == "float16":
+        return value.astype(np.float16), None
+
+    channel_axis = channel_axis % value.ndim
+    reduce_axes = tuple(axis for axis in range(value.ndim) if axis != channel_axis)
+    scale = np.abs(value).max(axis=reduce_axes, keepdims=True) / 127.0
+    scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+    quantized = np.clip(np.round(value / scale), -127, 127).astype(np.int8)
+    return quantized, scale
+
+
+def dequantize(quantized, scale):
+    """Return the float32 weights represented by the output of quantize()."""
+
+    if scale is None:
+        return quantized.astype(np.float32)
+    return quantized.astype(np.float32) * scale
+
+
+def channel_axis(name):
+    """Return the output channel axis of a gpt-2-simple weight: rows of the embeddings, the last axis otherwise."""
+
+    return 0 if name.split("/")[-1] in ("wte", "wpe") else -1
+
+
+def build_generate_graph(hparams, reader, mode):
+    """Build the cached decoding graph in the default graph, with weights from a checkpoint reader as constants.
+
+    Returns:
+        A dict of statistics on the stored weights (bytes as stored and as float32, and quantization error).
+    """
+
+    import tensorflow as tf
+    from gpt_2_simple.src import model
+
+    stats = {"bytes": 0, "float32_bytes": 0, "max_abs_error": 0.0, "sum_abs_error": 0.0, "n_weights": 0}
+    weights = {}
+    initializers = []
+
+    def constant_getter(getter, name, *args, **kwargs):
+        """Return checkpoint weights (dequantized once into a variable) in place of the model's variables."""
+
+        # The model is built twice (for the context and for the decoding loop); both share the same weights
+        if name in weights:
+            return weights[name]
+        value = reader.get_tensor(name)
+        # Only matrices are quantized; vectors are small and sensitive to error
+        quantized, scale = quantize(value, mode if value.ndim >= 2 else "float32", channel_axis(name))
+        error = np.abs(dequantize(quantized, scale) - value)
+        stats["bytes"] += quantized.nbytes + (scale.nbytes if scale is not None else 0)
+        stats["float32_bytes"] += value.size * 4
+        stats["max_abs_error"] = max(stats["max_abs_error"], float(error.max(initial=0.0)))
+        stats["sum_abs_error"] += float(error.sum())
+        stats["n_weights"] += value.size
+
+        if value.ndim < 2:
+            weights[name] = tf.constant(quantized, name=name.split("/")[-1])
+            return weights[name]
+        # Matrices are copied into variables by the "init" op, even as float32: a session keeps a copy of every constant
+        # for each distinct run signature, so constants used by "start" and "tokens" would be held twice more
+        if quantized.dtype == np.float16:
+            # TensorFlow serializes float16 constants element by element (larger and much slower to write), so store
+            # the raw bits as int16 and reinterpret them in the graph
+            constant = tf.bitcast(tf.constant(quantized.view(np.int16), name=name.split("/")[-1]), tf.float16)
+        else:
+            constant = tf.constant(quantized, name=name.split("/")[-1])
+        dequantized = tf.cast(constant, tf.float32)
+        if scale is not None:
+            dequantized = dequantized * tf.constant(scale)
+        variable = tf.compat.v1.Variable(tf.zeros(value.shape, tf.float32), name=name.split("/")[-1] + "_float32", use_resource=True)
+        initializers.append(variable.assign(dequantized, read_value=False))
+        weights[name] = variable
+        return variable
+
+    def step(tokens, past=None):
+        with tf.compat.v1.variable_scope(tf.compat.v1.get_variable_scope(), custom_getter=constant_getter):
+            lm_output = model.model(hparams=hparams, X=tokens, past=past, reuse=tf.compat.v1.AUTO_REUSE)
+        presents = lm_output["present"]
+        presents.set_shape(model.past_shape(hparams=hparams))
+        return lm_output["logits"][:, :, :hparams.n_vocab], presents
+
+    context = tf.compat.v1.placeholder(tf.int32, [None, None], name="context")
+    length = tf.compat.v1.placeholder_with_default(1, [], name="length")
+    temperature = tf.compat.v1.placeholder_with_default(1.0, [], name="temperature")
+    top_k = tf.compat.v1.placeholder_with_default(0, [], name="top_k")
+    # Cache of keys/values and the last token of each row, kept in the session between runs
+    past_var = tf.compat.v1.Variable(tf.zeros([0]), shape=tf.TensorShape(None), validate_shape=False, name="past", use_resource=True)
+    prev_var = tf.compat.v1.Variable(tf.zeros([0], tf.int32), shape=tf.TensorShape(None), validate_shape=False, name="prev", use_resource=True)
+
+    # Run the model on all but the last context token, which the first decoding step feeds
+    _, presents = step(context[:, :-1])
+    tf.group(past_var.assign(presents, read_value=False), prev_var.assign(context[:, -1], read_value=False), name="start")
+
+    def body(past, prev, output):
+        logits, presents = step(prev[:, tf.newaxis], past)
+        logits = logits[:, -1, :] / temperature
+
+        # As top_k_logits of gpt-2-simple, which needs k as a Python int; here k is fed at run time
+        def truncate():
+            threshold = tf.nn.top_k(logits, k=tf.maximum(top_k, 1))[0][:, -1:]
+            return tf.compat.v1.where(logits < threshold, tf.ones_like(logits) * -1e10, logits)
+
+        logits = tf.cond(top_k > 0, truncate, lambda: logits)
+        samples = tf.random.categorical(logits, num_samples=1, dtype=tf.int32)
+        return [tf.concat([past, presents], axis=-2), samples[:, 0], tf.concat([output, samples], axis=1)]
+
+    past = past_var.read_value()
+    past.set_shape(model.past_shape(hparams=hparams))
+    prev = prev_var.read_value()
+    prev.set_shape([None])
+    past, prev, tokens = tf.while_loop(
+        cond=lambda *args: True,
+        body=body,
+        maximum_iterations=length,
+        loop_vars=[past, prev, tf.zeros([tf.shape(prev)[0], 0], tf.int32)],
+        shape_invariants=[tf.TensorShape(model.past_shape(hparams=hparams)), tf.TensorShape([None]), tf.TensorShape([None, None])],
+    )
+    with tf.control_dependencies([past_var.assign(past, read_value=False), prev_var.assign(prev, read_value=False)]):
+        tf.identity(tokens, name="tokens")
+    tf.group(*initializers, name="init")
+
+    stats["mean_abs_error"] = stats.pop("sum_abs_error") / max(stats["n_weights"], 1)
+    return stats
+
+
+def main(args=None):
+    """Export a checkpoint as a frozen inference graph."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("export", args)
+
+    # Import TensorFlow only once arguments are parsed, so that --help and argument errors return immediately
+    with profiler.stage("import"):
+        import tensorflow as tf
+
+    checkpoint_path = get_checkpoint_path(args.run_name, CHECKPOINT_DIR)
+    output_dir = args.output if args.output is not None else os.path.join(EXPORT_DIR, f"{args.run_name}_{args.quantize}")
+    if args.checkpoint == "latest":
+        ckpt = tf.train.latest_checkpoint(checkpoint_path)
+    else:
+        ckpt = os.path.join(checkpoint_path, args.checkpoint)
+
+    # Build the decoding graph with the checkpoint's weights as constants; its only variables are filled at load time
+    with profiler.stage("build_graph"):
+        hparams = load_hparams(checkpoint_path)
+        reader = tf.train.load_checkpoint(ckpt)
+        graph = tf.Graph()
+        with graph.as_default():
+            stats = build_generate_graph(hparams, reader, args.quantize)
+        output_names = [name.split(":")[0] for name in OUTPUTS.values()] + list(OPS.values())
+        graph_def = tf.compat.v1.graph_util.extract_sub_graph(graph.as_graph_def(), output_names)
+
+    with profiler.stage("write_output"):
+        os.makedirs(output_dir, exist_ok=True)
+        tf.io.write_graph(graph_def, output_dir, GRAPH_FILE, as_text=False)
+        for file_name in ENCODER_FILES:
+            shutil.copy(os.path.join(checkpoint_path, file_name), os.path.join(output_dir, file_name))
+        meta = {
+            "run_name": args.run_name,
+            "checkpoint": ckpt,
+            "quantize": args.quantize,
+            "hparams": {key: getattr(hparams, key) for key in ["n_vocab", "n_ctx", "n_embd", "n_head", "n_layer"]},
+            "inputs": INPUTS,
+            "outputs": OUTPUTS,
+            "ops": OPS,
+            "graph_bytes": os.path.getsize(os.path.join(output_dir, GRAPH_FILE)),
+            "weights": stats,
+        }
+        with open(os.path.join(output_dir, META_FILE), 'w') as file:
+            json.dump(meta, file, indent=4)
+
+    print(f"Exported {ckpt} to {output_dir} ({args.quantize} weights, {meta['graph_bytes'] / 2**20:.1f} MB, "
+        f"{stats['float32_bytes'] / 2**20:.1f} MB as float32; mean absolute weight error {stats['mean_abs_error']:.2e}).")
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
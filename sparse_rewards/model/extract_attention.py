@@ -0,0 +1,234 @@
+"""Extract per-layer, per-head attention maps of a fine-tuned model for a file of prompt-response pairs.
+
+The checkpoint is loaded once and lines are run in batches. Attention tensors are written to memory-mapped .npy files
+in an output directory (optionally as float16 or reduced to the top-k keys of each query), and the mean attention from
+response tokens to each board position (facelet or cell) is accumulated as batches stream through, so thousands of
+examples can be analysed without holding them in memory. Load the results with np.load(path, mmap_mode="r").
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+
+from sparse_rewards.model.model_utils import CHECKPOINT_DIR, get_checkpoint_path, load_hparams, restore_checkpoint
+from sparse_rewards.utils.attention import token_spans, position_map, query_mask, top_k, PositionAttention
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+# Number of board positions in a prompt for each game
+N_POSITIONS = {"rubiks": 54, "sudoku": 81}
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Extract attention maps of a fine-tuned model for a file of prompt-response pairs.")
+    parser.add_argument("--run_name", help="Name of existing model run to load.", required=True)
+    parser.add_argument("--checkpoint", default="latest", help="Checkpoint of the run to load, e.g. model-500 (default latest).")
+    parser.add_argument("--data", required=True,
+        help="File containing lines in the format <|startoftext|>[WP] (prompt)[RESPONSE](response)<|endoftext|>, e.g. test data or model output.")
+    parser.add_argument("--game", choices=list(N_POSITIONS), default="rubiks",
+        help="Game of the prompts, which sets the number of board positions per prompt (default rubiks).")
+    parser.add_argument("--output", default=None, help="Name of directory to write attention store to (default {run_name}_attention).")
+    parser.add_argument("--skip_first", type=int, default=0, help="Skip this many lines of the data file (default 0).")
+    parser.add_argument("--n_examples", type=int, default=None, help="Number of lines to process (default all).")
+    parser.add_argument("--batch_size", type=int, default=8, help="Number of lines per forward pass (default 8).")
+    parser.add_argument("--layers", type=int, nargs="+", default=None, help="Layers to extract (default all).")
+    parser.add_argument("--store", choices=["full", "topk", "none"], default="full",
+        help="Store full attention tensors, only the top-k keys of each query, or only position statistics (default full).")
+    parser.add_argument("--top_k", type=int, default=8, help="Number of keys to keep per query with --store topk (default 8).")
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float16", help="Precision of stored attention weights (default float16).")
+    parser.add_argument("--prompt_start", help="Token indicating start of prompt (default <|startoftext|>[WP]).", default="<|startoftext|>[WP]")
+    parser.add_argument("--response_start", help="Token indicating start of response (default [RESPONSE]).", default="[RESPONSE]")
+    parser.add_argument("--response_end", help="Token indicating end of response (default <|endoftext|>).", default="<|endoftext|>")
+    add_profiling_args(parser)
+    return parser
+
+
+def attention_tensors(graph, layers, scope="model"):
+    """Return the attention weight tensors (batch, heads, query, key) of the given layers of a gpt-2-simple graph.
+
+    gpt-2-simple does not expose attention weights, so take the softmax output feeding the second matmul of each
+    layer's multihead attention (attention weights times values).
+    """
+
+    return [graph.get_operation_by_name(f"{scope}/h{layer}/attn/MatMul_1").inputs[0] for layer in layers]
+
+
+def encode_example(enc, line, n_positions, prompt_start, response_start, response_end, max_tokens):
+    """Tokenize a line and locate its board positions and response tokens.
+
+    Returns:
+        A dict with the token ids, position map (T, n_positions), response query mask (T,) and the number of board
+        positions found in the prompt.
+    """
+
+    text = line.strip()
+    tokens = enc.encode(text)[:max_tokens]
+    spans = token_spans([enc.decode([token]) for token in tokens])
+
+    # Prompt runs from after the prompt start token to the response start token, and the response from there to the
+    # response end token
+    prompt_begin = text.find(prompt_start)
+    prompt_begin = prompt_begin + len(prompt_start) if prompt_begin >= 0 else 0
+    prompt_end = text.find(response_start, prompt_begin)
+    if prompt_end < 0:
+        prompt_end = response_begin = response_stop = len(text)
+    else:
+        response_begin = prompt_end + len(response_start)
+        response_stop = text.find(response_end, response_begin)
+        if response_stop < 0:
+            response_stop = len(text)
+
+    maps, n_found = position_map(spans, text, prompt_begin, prompt_end, n_positions)
+    return {
+        "tokens": np.array(tokens, dtype=np.int32),
+        "maps": maps,
+        "queries": query_mask(spans, response_begin, response_stop),
+        "n_found": n_found,
+    }
+
+
+def main(args=None):
+    """Extract attention maps and position statistics for a data file."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("extract_attention", args)
+
+    # The model code needs TensorFlow; importing it after argument parsing keeps --help fast and times the import
+    with profiler.stage("import"):
+        import tensorflow as tf
+        import gpt_2_simple as gpt2
+        from gpt_2_simple.src import model, encoder
+
+    checkpoint_path = get_checkpoint_path(args.run_name, CHECKPOINT_DIR)
+    output_dir = args.output if args.output is not None else f"{args.run_name}_attention"
+    n_positions = N_POSITIONS[args.game]
+
+    with profiler.stage("read_data"):
+        with open(args.data, 'r') as file:
+            lines = [line for line in file.readlines() if line.strip()]
+        lines = lines[args.skip_first:]
+        if args.n_examples is not None:
+            lines = lines[:args.n_examples]
+
+    # Build a graph with a batched input and restore the checkpoint into it
+    with profiler.stage("load_model"):
+        hparams = load_hparams(checkpoint_path)
+        layers = args.layers if args.layers is not None else list(range(hparams.n_layer))
+        sess = gpt2.start_tf_sess()
+        context = tf.compat.v1.placeholder(tf.int32, [None, None])
+        model.model(hparams=hparams, X=context)
+        ckpt = restore_checkpoint(sess, checkpoint_path, args.checkpoint)
+        fetches = attention_tensors(sess.graph, layers)
+        enc = encoder.get_encoder(checkpoint_path)
+
+    with profiler.stage("tokenize", items=len(lines)):
+        examples = [encode_example(enc, line, n_positions, args.prompt_start, args.response_start, args.response_end, hparams.n_ctx)
+            for line in lines]
+    n_malformed = sum(example["n_found"] != n_positions for example in examples)
+    if n_malformed > 0:
+        print(f"Warning: {n_malformed} prompt(s) do not contain {n_positions} board positions.")
+
+    # Create the store; every array has one row per example, padded to the longest example
+    n_examples = len(examples)
+    n_layers = len(layers)
+    lengths = np.array([len(example["tokens"]) for example in examples], dtype=np.int64)
+    width = int(lengths.max(initial=1))
+    os.makedirs(output_dir, exist_ok=True)
+    tokens = np.full((n_examples, width), -1, dtype=np.int32)
+    for i, example in enumerate(examples):
+        tokens[i, :lengths[i]] = example["tokens"]
+    np.save(os.path.join(output_dir, "tokens.npy"), tokens)
+    np.save(os.path.join(output_dir, "lengths.npy"), lengths)
+
+    shape = (n_examples, n_layers, hparams.n_head, width)
+    store = {}
+    if args.store == "full":
+        store["attention"] = np.lib.format.open_memmap(os.path.join(output_dir, "attention.npy"), mode="w+", dtype=args.dtype,
+            shape=shape + (width,))
+    elif args.store == "topk":
+        k = min(args.top_k, width)
+        store["top_k_indices"] = np.lib.format.open_memmap(os.path.join(output_dir, "top_k_indices.npy"), mode="w+",
+            dtype=np.int16 if width <= np.iinfo(np.int16).max else np.int32, shape=shape + (k,))
+        store["top_k_weights"] = np.lib.format.open_memmap(os.path.join(output_dir, "top_k_weights.npy"), mode="w+",
+            dtype=args.dtype, shape=shape + (k,))
+    position_attention = np.lib.format.open_memmap(os.path.join(output_dir, "position_attention.npy"), mode="w+",
+        dtype=np.float32, shape=(n_examples, n_layers, hparams.n_head, n_positions))
+    stats = PositionAttention(n_layers, hparams.n_head, n_positions)
+
+    for start in range(0, n_examples, args.batch_size):
+        batch = examples[start:start + args.batch_size]
+        batch_lengths = lengths[start:start + len(batch)]
+        batch_width = int(batch_lengths.max())
+
+        # Right-pad the batch; under the causal mask padding does not affect attention of earlier tokens
+        ids = np.zeros((len(batch), batch_width), dtype=np.int32)
+        maps = np.zeros((len(batch), batch_width, n_positions), dtype=np.float32)
+        queries = np.zeros((len(batch), batch_width), dtype=bool)
+        for i, example in enumerate(batch):
+            ids[i, :batch_lengths[i]] = example["tokens"]
+            maps[i, :batch_lengths[i]] = example["maps"]
+            queries[i, :batch_lengths[i]] = example["queries"]
+
+        with profiler.stage("forward", items=len(batch)):
+            attention = np.stack(sess.run(fetches, feed_dict={context: ids}), axis=1)
+        # Zero the rows of padding queries
+        padding = np.arange(batch_width)[None, :] >= batch_lengths[:, None]
+        attention *= ~padding[:, None, None, :, None]
+
+        with profiler.stage("statistics", items=len(batch)):
+            position_attention[start:start + len(batch)] = stats.update(attention, maps, queries)
+
+        with profiler.stage("write", items=len(batch)):
+            rows = slice(start, start + len(batch))
+            if args.store == "full":
+                store["attention"][rows, :, :, :batch_width, :batch_width] = attention
+            elif args.store == "topk":
+                # Padding queries have all-zero weights, so their indices are -1
+                indices, weights = top_k(attention, k)
+                block = np.full((len(batch), n_layers, hparams.n_head, width, k), -1, dtype=store["top_k_indices"].dtype)
+                block[:, :, :, :batch_width, :indices.shape[-1]] = indices
+                store["top_k_indices"][rows] = block
+                store["top_k_weights"][rows, :, :, :batch_width, :weights.shape[-1]] = weights
+
+    with profiler.stage("write", items=0):
+        for array in list(store.values()) + [position_attention]:
+            array.flush()
+        np.save(os.path.join(output_dir, "position_attention_mean.npy"), stats.mean())
+        meta = {
+            "run_name": args.run_name,
+            "checkpoint": ckpt,
+            "data": args.data,
+            "game": args.game,
+            "n_examples": n_examples,
+            "n_positions": n_positions,
+            "n_response_tokens": stats.n_queries,
+            "layers": layers,
+            "n_head": hparams.n_head,
+            "max_tokens": width,
+            "store": args.store,
+            "dtype": args.dtype,
+            "top_k": args.top_k if args.store == "topk" else None,
+            "files": {
+                "tokens.npy": "(examples, tokens) token ids, padded with -1",
+                "lengths.npy": "(examples,) number of tokens",
+                "attention.npy": "(examples, layers, heads, query, key) attention weights, zero-padded",
+                "top_k_indices.npy": "(examples, layers, heads, query, k) key indices, largest weight first, -1 where unused",
+                "top_k_weights.npy": "(examples, layers, heads, query, k) attention weights of top_k_indices",
+                "position_attention.npy": "(examples, layers, heads, positions) mean attention from response tokens to each board position",
+                "position_attention_mean.npy": "(layers, heads, positions) mean attention from all response tokens to each board position",
+            },
+        }
+        with open(os.path.join(output_dir, "meta.json"), 'w') as file:
+            json.dump(meta, file, indent=4)
+
+    print(f"Wrote attention of {n_examples} examples ({stats.n_queries} response tokens) to {output_dir}.")
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
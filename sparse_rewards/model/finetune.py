@@ -0,0 +1,73 @@
+"""Download or load a GPT-2 instance and fine-tune on specified text data file."""
+
+import os
+import argparse
+
+# Set default model size
+DEFAULT_MODEL_NAME = "124M"
+# Paths to model and checkpoint locations
+MODEL_DIR = "models"
+CHECKPOINT_DIR = "checkpoint"
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Download or load GPT-2 instance and fine-tune on text data.")
+    parser.add_argument("--model_name", help=f"Size of GPT-2 insance to download from gpt-2-simple (default '{DEFAULT_MODEL_NAME}').", 
+        default=DEFAULT_MODEL_NAME, required=False)
+    parser.add_argument("--load", help="Name of run folder from which to load model parameters (if loading an existing model).", default=None, required=False)
+    parser.add_argument("--save", help="Name of run folder to save model parameters to; will overwrite if this folder already exists (default run1).", default="run1", required=False)
+    parser.add_argument("--data", help="Path to text data file to use for fine-tuning.", required=True)
+    # Hyperparameters
+    parser.add_argument("--batch_size", type=int, default=1)
+    parser.add_argument("--lr", type=float, default=0.0001)
+    parser.add_argument("--sample_every", type=int, default=100)
+    parser.add_argument("--sample_len", type=int, default=1023)
+    parser.add_argument("--print_every", type=int, default=1)
+    parser.add_argument("--save_every", type=int, default=500)
+    parser.add_argument("--max_checkpoints", type=int, default=1,
+        help="Number of most recent checkpoints to keep (default 1). Raise this to compare checkpoints over training with sweep.")
+    parser.add_argument("--optimizer", default="adam")
+    return parser
+
+
+def main(args=None):
+    if args is None:
+        args = build_parser().parse_args()
+
+    # gpt-2-simple pulls in TensorFlow, so it is imported here rather than when the CLI builds its parser
+    import gpt_2_simple as gpt2
+
+    # Start gpt-2 sess
+    sess = gpt2.start_tf_sess()
+
+    # Load existing model if specified
+    if args.load is not None:
+        print(f"Loading model {args.load}...")
+        gpt2.load_gpt2(sess, run_name=args.load, model_dir=MODEL_DIR, checkpoint_dir=CHECKPOINT_DIR)
+    # Otherwise download new model
+    else:
+        print(f"Downloading model {args.model_name}...")
+        gpt2.download_gpt2(model_dir=MODEL_DIR, model_name=args.model_name)
+
+    # Fine-tune model on data file
+    gpt2.finetune(sess,
+        args.data,
+        model_name=args.model_name,
+        model_dir=MODEL_DIR,
+        checkpoint_dir=CHECKPOINT_DIR,
+        batch_size=args.batch_size,
+        learning_rate=args.lr,
+        sample_every=args.sample_every,
+        sample_length=args.sample_len,
+        save_every=args.save_every,
+        max_checkpoints=args.max_checkpoints,
+        print_every=args.print_every,
+        optimizer=args.optimizer,
+        run_name=args.save)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
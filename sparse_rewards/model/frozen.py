@@ -0,0 +1,85 @@
+"""Load a frozen inference graph written by export and generate from it with a cached past.
+
+The keys/values of previous tokens stay inside the session: the context is run through the model once, then tokens are
+sampled in chunks by a loop inside the graph. Between chunks only the sampled tokens are fetched, and generation stops
+as soon as every prompt in the batch has produced the stop text, instead of always decoding a fixed number of tokens.
+"""
+
+import os
+import json
+
+import numpy as np
+
+from sparse_rewards.model.export import GRAPH_FILE, META_FILE
+
+
+class FrozenModel:
+    """A frozen inference graph loaded into its own session, with its encoder.
+
+    The cache of a batch is held in the session, so one model must not be used to generate from several threads at once.
+    After each call to generate, n_decoded holds the number of tokens it decoded over the whole batch, including tokens
+    sampled after a row's stop text and the rest of the last chunk.
+    """
+
+    def __init__(self, export_dir, threads=-1):
+        import tensorflow as tf
+        from tensorflow.core.protobuf import rewriter_config_pb2
+        from gpt_2_simple.src import encoder
+
+        with open(os.path.join(export_dir, META_FILE), 'r') as file:
+            self.meta = json.load(file)
+        self.hparams = self.meta["hparams"]
+        self.encoder = encoder.get_encoder(export_dir)
+
+        graph_def = tf.compat.v1.GraphDef()
+        with open(os.path.join(export_dir, GRAPH_FILE), 'rb') as file:
+            graph_def.ParseFromString(file.read())
+        self.graph = tf.Graph()
+        with self.graph.as_default():
+            tf.compat.v1.import_graph_def(graph_def, name="")
+
+        config = tf.compat.v1.ConfigProto()
+        # Constant folding would fold the dequantization of every weight into a new float32 constant when "init" runs,
+        # roughly tripling load time and adding a copy of the weights to peak memory
+        config.graph_options.rewrite_options.constant_folding = rewriter_config_pb2.RewriterConfig.OFF
+        if threads > 0:
+            config.intra_op_parallelism_threads = threads
+            config.inter_op_parallelism_threads = threads
+        self.sess = tf.compat.v1.Session(graph=self.graph, config=config)
+        self.inputs = {name: self.graph.get_tensor_by_name(tensor) for name, tensor in self.meta["inputs"].items()}
+        self.tokens = self.graph.get_tensor_by_name(self.meta["outputs"]["tokens"])
+        self.start = self.graph.get_operation_by_name(self.meta["ops"]["start"])
+        self.n_decoded = 0
+        # Copy the weights, dequantized, into their float32 variables once
+        self.sess.run(self.graph.get_operation_by_name(self.meta["ops"]["init"]))
+
+    def generate(self, contexts, length, temperature=1.0, top_k=0, stop=None, chunk=16):
+        """Continue a batch of token contexts, which must all have the same length.
+
+        Args:
+            length: Maximum number of tokens to generate.
+            stop: Optional text; a row stops once its decoded continuation contains it, and the batch stops once every
+                row has stopped.
+            chunk: Number of tokens sampled per run of the graph; the stop text is checked after each chunk.
+
+        Returns:
+            A list of the decoded continuation of each context (truncated after stop, if given).
+        """
+
+        length = min(length, self.hparams["n_ctx"] - len(contexts[0]))
+        self.sess.run(self.start, feed_dict={self.inputs["context"]: np.array(contexts, dtype=np.int32)})
+        feed_dict = {self.inputs["temperature"]: temperature, self.inputs["top_k"]: top_k}
+        generated = np.zeros((len(contexts), 0), dtype=np.int32)
+        texts = [""] * len(contexts)
+        while generated.shape[1] < length:
+            feed_dict[self.inputs["length"]] = min(chunk, length - generated.shape[1])
+            generated = np.concatenate([generated, self.sess.run(self.tokens, feed_dict=feed_dict)], axis=1)
+            if stop is not None:
+                texts = [self.encoder.decode(row) for row in generated]
+                if all(stop in text for text in texts):
+                    break
+        self.n_decoded = generated.size
+
+        if stop is None:
+            return [self.encoder.decode(row) for row in generated]
+        return [text.split(stop)[0] + stop if stop in text else text for text in texts]
\ No newline at end of file
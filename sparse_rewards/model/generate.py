@@ -0,0 +1,218 @@
+"""Given a run name and a prefix or a text file of prefix-response pairs, use the prefix to generate responses."""
+
+import os
+import argparse
+
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+# Paths to model and checkpoint locations
+MODEL_DIR = "models"
+CHECKPOINT_DIR = "checkpoint"
+# Special tokens indicating start of prompt, start of response, and end of response
+PROMPT_START_TOKEN = "<|startoftext|>[WP]"
+RESPONSE_START_TOKEN = "[RESPONSE]"
+END_TOKEN = "<|endoftext|>"
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--run_name", help="Name of existing model run to load and use for generation.", required=True)
+    parser.add_argument("--prefix", default=None, 
+        help="Text prefix to use for generation. If specified, ignores --data argument and prints the generated response to this prefix before quitting.", required=False)
+    parser.add_argument("--data", default=None, 
+        help="File containing lines in the format <|startoftext|>[WP] (prefix)[RESPONSE](response)<|endoftext|> whose prefixes will be used to generate responses.", required=False)
+    parser.add_argument("--output", default=None, help="Name of file to write generated response(s) to. Default is {run_name}_responses.txt", required=False)
+    parser.add_argument("--skip_first", type=int, help="Skip this many prompts in input file before beginning to generate responses (default 0).", default=0)
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--n_samples", type=int, default=1, help="Number of responses to generate per prompt, each written on its own line (default 1).")
+    parser.add_argument("--stop_after", type=int, default=None)
+    parser.add_argument("--verbose", type=bool, default=False)
+    parser.add_argument("--save_every", type=int, default=25)
+    parser.add_argument("--export", default=None,
+        help="Generate from a frozen inference graph written by export (e.g. export/run1_int8) instead of the checkpoint of --run_name. \
+            Prompts are decoded in batches with cached keys/values, stopping at the response end token.")
+    parser.add_argument("--batch_size", type=int, default=8, help="Number of prompts decoded at once with --export (default 8).")
+    parser.add_argument("--length", type=int, default=512, help="Maximum number of tokens to generate per prompt with --export (default 512).")
+    parser.add_argument("--top_k", type=int, default=0, help="Sample from the top k tokens only with --export; 1 decodes greedily (default 0, no truncation).")
+    add_profiling_args(parser)
+    return parser
+
+
+def truncate_response(response):
+    """Truncate a generated line at the end-of-line token."""
+
+    return response.split(END_TOKEN)[0] + END_TOKEN
+
+
+def generate_to_file(prompts, batches, decode, output_file, args, profiler):
+    """Generate responses to batches of prompts and write them, one line per sample, in the order of the prompts.
+
+    Lines finished so far are saved every --save_every prompts, and when generation is interrupted with Ctrl+C.
+
+    Args:
+        batches: List of lists of indices of prompts decoded together.
+        decode: Function taking a batch of indices and returning, for each of its prompts, a list of generated lines
+            (each starting with the prompt).
+    """
+
+    output = {}
+
+    def save():
+        if args.verbose:
+            print(f"Saving to {output_file}...")
+        with profiler.stage("write_output"):
+            with open(output_file, 'w') as file:
+                file.write("\n".join(line for i in sorted(output) for line in output[i]))
+
+    try:
+        for indices in batches:
+            with profiler.stage("decode", items=len(indices)):
+                generated = decode(indices)
+            for i, lines in zip(indices, generated):
+                # Truncate
+                output[i] = [truncate_response(line) for line in lines]
+
+                # Show progress if applicable
+                if args.verbose:
+                    for line in output[i]:
+                        print(f"[{i+1} / {len(prompts)}] {line}")
+
+            # Save intermittently
+            if len(output) // args.save_every > (len(output) - len(indices)) // args.save_every:
+                save()
+
+    except KeyboardInterrupt as e:
+        pass
+
+    save()
+
+
+def generate_from_export(args, profiler):
+    """Generate responses with a frozen inference graph, batching prompts of equal token length."""
+
+    # Only this path needs NumPy; FrozenModel imports TensorFlow itself when the export is loaded
+    with profiler.stage("import"):
+        from sparse_rewards.model.frozen import FrozenModel
+        from sparse_rewards.model.model_utils import bucket_batches
+
+    with profiler.stage("load_model"):
+        frozen = FrozenModel(args.export)
+
+    if args.prefix is not None:
+        with profiler.stage("decode", items=args.n_samples):
+            output = frozen.generate([frozen.encoder.encode(args.prefix)] * args.n_samples, args.length, args.temperature, args.top_k)
+        print("\n".join(output))
+        if args.output is not None:
+            with profiler.stage("write_output"):
+                with open(args.output, 'w') as file:
+                    file.write("\n".join(args.prefix + text for text in output))
+        return
+
+    with profiler.stage("read_data"):
+        with open(args.data, 'r') as file:
+            samples = [line for line in file.readlines()]
+    samples = samples[args.skip_first:]
+    if args.stop_after is not None:
+        samples = samples[:args.stop_after]
+    prompts = [sample.split(RESPONSE_START_TOKEN)[0] + RESPONSE_START_TOKEN for sample in samples]
+    output_file = args.output if args.output is not None else args.run_name + "_responses.txt"
+
+    with profiler.stage("tokenize", items=len(prompts)):
+        contexts = [frozen.encoder.encode(prompt) for prompt in prompts]
+    # Each batch holds every sample of its prompts, so fewer prompts fit in a batch with more samples
+    batches = bucket_batches([len(context) for context in contexts], max(args.batch_size // args.n_samples, 1))
+
+    def decode(indices):
+        texts = frozen.generate([contexts[i] for i in indices for _ in range(args.n_samples)], args.length, args.temperature,
+            args.top_k, stop=END_TOKEN)
+        return [[prompts[i] + text for text in texts[j * args.n_samples:(j + 1) * args.n_samples]] for j, i in enumerate(indices)]
+
+    generate_to_file(prompts, batches, decode, output_file, args, profiler)
+
+
+def main(args=None):
+    if args is None:
+        args = build_parser().parse_args()
+
+    profiler = Profiler("generate", args)
+
+    if args.export is not None:
+        generate_from_export(args, profiler)
+        profiler.finish()
+        return
+
+    # Generating from a checkpoint is the only path needing gpt-2-simple, which takes seconds to import with TensorFlow
+    with profiler.stage("import"):
+        import gpt_2_simple as gpt2
+
+    # Start session
+    with profiler.stage("start_session"):
+        sess = gpt2.start_tf_sess()
+
+    # Load pre-trained/tuned model
+    with profiler.stage("load_model"):
+        gpt2.load_gpt2(sess, run_name=args.run_name, checkpoint_dir=CHECKPOINT_DIR)
+
+    # If prefix is specified, print generated response
+    if args.prefix is not None:
+        with profiler.stage("decode", items=1):
+            output = gpt2.generate(
+                sess, 
+                run_name=args.run_name, 
+                checkpoint_dir=CHECKPOINT_DIR, 
+                prefix=args.prefix, 
+                nsamples=args.n_samples, 
+                temperature=args.temperature, 
+                return_as_list=True)[0]
+        print(output)
+
+        # Write output to file, if specified
+        if args.output is not None:
+            with profiler.stage("write_output"):
+                with open(args.output, 'w') as file:
+                    file.write(args.prefix + output)
+
+    # Otherwise, load data file, separate prefixes from responses, generate output for each prefix, and record
+    else:
+        # Open data file
+        with profiler.stage("read_data"):
+            with open(args.data, 'r') as file:
+                samples = [line for line in file.readlines()]
+
+        # Skip as many samples (lines) as required
+        samples = samples[args.skip_first:]
+        if args.stop_after is not None:
+            samples = samples[:args.stop_after]
+        
+        # Split each sample into prompt and existing (correct) response
+        split_samples = [sample.split(RESPONSE_START_TOKEN) for sample in samples]
+        prompts = [sample[0] + RESPONSE_START_TOKEN for sample in split_samples]
+
+        # If output file not specified, default to {run_name}_responses.txt
+        if args.output is None:
+            output_file = args.run_name + "_responses.txt"
+        else:
+            output_file = args.output
+
+        # Generate new responses for each prompt in turn
+        def decode(indices):
+            return [gpt2.generate(
+                    sess, 
+                    run_name=args.run_name, 
+                    checkpoint_dir=CHECKPOINT_DIR, 
+                    prefix=prompts[i], 
+                    nsamples=args.n_samples,
+                    temperature=args.temperature,
+                    return_as_list=True
+                ) for i in indices]
+
+        generate_to_file(prompts, [[i] for i in range(len(prompts))], decode, output_file, args, profiler)
+
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
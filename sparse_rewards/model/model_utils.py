@@ -0,0 +1,85 @@
+"""Helpers for loading fine-tuned gpt-2-simple checkpoints into a TensorFlow graph built by the caller.
+
+gpt2.load_gpt2 always builds a graph with a batch size of 1; these helpers let commands build their own graph (e.g. with
+a batched input, or with extra outputs) and restore checkpoint weights into it. TensorFlow and gpt-2-simple are only
+imported inside the functions which need them.
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+# Path to checkpoint locations
+CHECKPOINT_DIR = "checkpoint"
+
+
+def get_checkpoint_path(run_name, checkpoint_dir=CHECKPOINT_DIR):
+    """Return the directory holding the checkpoints of a run."""
+
+    return os.path.join(checkpoint_dir, run_name)
+
+
+def list_checkpoints(checkpoint_path):
+    """Return a list of (step, name) of the checkpoints saved in checkpoint_path (e.g. (500, "model-500")), ordered by step."""
+
+    checkpoints = []
+    for file_name in os.listdir(checkpoint_path):
+        match = re.fullmatch(r"(.+-(\d+))\.index", file_name)
+        if match:
+            checkpoints.append((int(match.group(2)), match.group(1)))
+    return sorted(checkpoints)
+
+
+def bucket_batches(lengths, batch_size):
+    """Group example indices into batches of at most batch_size examples which all have the same number of tokens.
+
+    gpt-2-simple's sampler takes a rectangular batch of context tokens, so prompts can only be decoded together if they
+    have the same length.
+
+    Returns:
+        A list of index arrays, ordered by length and then by index.
+    """
+
+    lengths = np.asarray(lengths)
+    order = np.argsort(lengths, kind="stable")
+    batches = []
+    for length in np.unique(lengths):
+        indices = order[lengths[order] == length]
+        batches.extend(indices[i:i + batch_size] for i in range(0, len(indices), batch_size))
+    return batches
+
+
+def load_hparams(checkpoint_path):
+    """Load the model hyperparameters saved alongside a run's checkpoints."""
+
+    from gpt_2_simple.src import model
+
+    hparams = model.default_hparams()
+    with open(os.path.join(checkpoint_path, "hparams.json"), 'r') as file:
+        hparams.override_from_dict(json.load(file))
+    return hparams
+
+
+def restore_checkpoint(sess, checkpoint_path, checkpoint="latest", saver=None):
+    """Restore model weights into the graph of sess.
+
+    Args:
+        checkpoint: "latest", or the name of a checkpoint in checkpoint_path (e.g. model-500).
+        saver: Optional tf.compat.v1.train.Saver to reuse when restoring repeatedly into the same graph.
+
+    Returns:
+        The path of the restored checkpoint.
+    """
+
+    import tensorflow as tf
+
+    if checkpoint == "latest":
+        ckpt = tf.train.latest_checkpoint(checkpoint_path)
+    else:
+        ckpt = os.path.join(checkpoint_path, checkpoint)
+    if saver is None:
+        saver = tf.compat.v1.train.Saver(allow_empty=True)
+    saver.restore(sess, ckpt)
+    return ckpt
\ No newline at end of file
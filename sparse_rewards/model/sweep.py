@@ -0,0 +1,204 @@
+"""Evaluate every saved checkpoint of a run on a fixed test subset in one process, producing an accuracy-over-training table.
+
+TensorFlow is started and the sampling graph built once; each checkpoint is then restored into the same warm session.
+Prompts are decoded in batches, and each decoded batch is verified on a background thread while the next batch is
+decoding. Decoding is greedy by default, so that differences between checkpoints come from training rather than from
+the random samples each checkpoint happens to draw.
+"""
+
+import os
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sparse_rewards.model.model_utils import CHECKPOINT_DIR, get_checkpoint_path, list_checkpoints, bucket_batches, load_hparams, restore_checkpoint
+from sparse_rewards.utils.data_utils import line_pattern, parse_line
+from sparse_rewards.utils.profiling import Profiler, add_profiling_args
+
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description="Evaluate every saved checkpoint of a run on a fixed test subset.")
+    parser.add_argument("--run_name", help="Name of existing model run whose checkpoints to evaluate.", required=True)
+    parser.add_argument("--data", required=True,
+        help="File containing lines in the format <|startoftext|>[WP] (prompt)[RESPONSE](response)<|endoftext|>; responses are used as references.")
+    parser.add_argument("--game", choices=["rubiks", "sudoku"], default="rubiks", help="Game of the data, which selects the evaluator (default rubiks).")
+    parser.add_argument("--checkpoints", nargs="+", default=None,
+        help="Names of checkpoints to evaluate, e.g. model-500 model-1000 (default: all checkpoints in checkpoint/<run_name>). \
+            Note finetune only keeps the latest checkpoint unless --max_checkpoints is raised.")
+    parser.add_argument("--skip_first", type=int, default=0, help="Skip this many lines of the data file (default 0).")
+    parser.add_argument("--n_examples", type=int, default=200, help="Number of lines to evaluate each checkpoint on (default 200).")
+    parser.add_argument("--batch_size", type=int, default=16, help="Number of prompts decoded at once (default 16).")
+    parser.add_argument("--length", type=int, default=256, help="Number of tokens to decode per prompt (default 256).")
+    parser.add_argument("--temperature", type=float, default=0.7)
+    parser.add_argument("--top_k", type=int, default=1,
+        help="Sample from the top k tokens only; 0 disables truncation (default 1, greedy decoding, so checkpoints are compared on identical decoding).")
+    parser.add_argument("--seed", type=int, default=0,
+        help="TensorFlow random seed, set once for the whole sweep; only used when sampling with --top_k other than 1 (default 0).")
+    parser.add_argument("--output", default=None, help="Name of file to write the accuracy-over-training table to (default {run_name}_sweep.<format>).")
+    parser.add_argument("--format", choices=["csv", "parquet", "json"], default="csv", help="Format of the output table (default csv).")
+    parser.add_argument("--save_responses", default=None,
+        help="Optional directory to write each checkpoint's responses to, as {checkpoint}_responses.txt in the format of generate.")
+    parser.add_argument("--prompt_start", help="Token indicating start of prompt (default <|startoftext|>[WP]).", default="<|startoftext|>[WP]")
+    parser.add_argument("--response_start", help="Token indicating start of response (default [RESPONSE]).", default="[RESPONSE]")
+    parser.add_argument("--response_end", help="Token indicating end of response (default <|endoftext|>).", default="<|endoftext|>")
+    add_profiling_args(parser)
+    return parser
+
+
+def evaluate_responses(game, prompts, responses, references):
+    """Evaluate responses to prompts (board strings) with the evaluator of a game.
+
+    Returns:
+        A pandas DataFrame with one row per response, including a result column ("Correct", "Incorrect" or "Invalid").
+    """
+
+    if game == "rubiks":
+        from sparse_rewards.model.eval_rubiks_output import evaluate
+
+        return evaluate(prompts, responses, references)
+
+    import pandas as pd
+    from sparse_rewards.model.eval_sudoku_output import eval_boards
+    from sparse_rewards.utils.sudoku_utils import strings_to_boards
+
+    prompt_boards, prompts_ok = strings_to_boards(prompts)
+    response_boards, responses_ok = strings_to_boards(responses)
+    solutions, _ = strings_to_boards(references)
+    results, cell_accuracy = eval_boards(prompt_boards, response_boards, prompts_ok & responses_ok, solutions)
+    return pd.DataFrame({"prompt": prompts, "response": responses, "result": results, "cell_accuracy": cell_accuracy})
+
+
+def summarize_checkpoint(game, df):
+    """Return a dict of summary metrics for the evaluated responses of one checkpoint."""
+
+    if game == "rubiks":
+        from sparse_rewards.model.eval_rubiks_output import summarize
+
+        return summarize(df).iloc[0].to_dict()
+
+    valid = df["result"] != "Invalid"
+    return {
+        "n": len(df),
+        "correct": float((df["result"] == "Correct").mean()),
+        "incorrect": float((df["result"] == "Incorrect").mean()),
+        "invalid": float((~valid).mean()),
+        "cell_accuracy": float(df["cell_accuracy"][valid].mean()) if valid.any() else 0.0,
+    }
+
+
+def main(args=None):
+    """Decode and evaluate a test subset with every checkpoint of a run."""
+
+    if args is None:
+        args = build_parser().parse_args()
+    profiler = Profiler("sweep", args)
+
+    # pandas, TensorFlow and gpt-2-simple together take seconds to import; time them as their own stage
+    with profiler.stage("import"):
+        import pandas as pd
+        import tensorflow as tf
+        import gpt_2_simple as gpt2
+        from gpt_2_simple.src import encoder, sample
+        from sparse_rewards.model.eval_rubiks_output import write_table
+
+    checkpoint_path = get_checkpoint_path(args.run_name, CHECKPOINT_DIR)
+    checkpoints = list_checkpoints(checkpoint_path)
+    if args.checkpoints is not None:
+        checkpoints = [(step, name) for step, name in checkpoints if name in args.checkpoints]
+    if not checkpoints:
+        raise ValueError(f"No checkpoints to evaluate in {checkpoint_path}.")
+    output_file = args.output if args.output is not None else f"{args.run_name}_sweep.{args.format}"
+
+    # Read the fixed test subset and split each line into prompt text (fed to the model), board and reference response
+    with profiler.stage("read_data"):
+        with open(args.data, 'r') as file:
+            lines = [line.strip() for line in file.readlines() if line.strip()]
+        lines = lines[args.skip_first:args.skip_first + args.n_examples]
+        pattern = line_pattern(args.prompt_start, args.response_start, args.response_end)
+        pairs = [parse_line(line, pattern) for line in lines]
+        prompt_texts = [line.split(args.response_start)[0] + args.response_start for line in lines]
+        boards = [prompt for prompt, _ in pairs]
+        references = [reference for _, reference in pairs]
+
+    # Build the sampling graph once for a fixed batch size; every checkpoint is restored into it
+    with profiler.stage("build_graph"):
+        hparams = load_hparams(checkpoint_path)
+        enc = encoder.get_encoder(checkpoint_path)
+        sess = gpt2.start_tf_sess()
+        tf.compat.v1.set_random_seed(args.seed)
+        context = tf.compat.v1.placeholder(tf.int32, [args.batch_size, None])
+        output = sample.sample_sequence(hparams=hparams, length=args.length, context=context, batch_size=args.batch_size,
+            temperature=args.temperature, top_k=args.top_k)
+        saver = tf.compat.v1.train.Saver(allow_empty=True)
+
+    with profiler.stage("tokenize", items=len(prompt_texts)):
+        prompt_tokens = [enc.encode(text) for text in prompt_texts]
+        batches = bucket_batches([len(tokens) for tokens in prompt_tokens], args.batch_size)
+
+    def verify(indices, texts):
+        """Truncate decoded texts at the response end token and evaluate them (run on the worker thread)."""
+
+        continuations = [text.split(args.response_end)[0] for text in texts]
+        responses = [continuation.strip() for continuation in continuations]
+        df = evaluate_responses(args.game, [boards[i] for i in indices], responses, [references[i] for i in indices])
+        df.index = indices
+        # Untrimmed, so saved responses keep the spacing of the data format
+        df["continuation"] = continuations
+        return df
+
+    # Decode on the main thread (TensorFlow releases the GIL) and verify on a worker thread, so verification of each
+    # batch overlaps decoding of the next
+    pending = []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for step, name in checkpoints:
+            with profiler.stage("restore"):
+                restore_checkpoint(sess, checkpoint_path, name, saver)
+            futures = []
+            decode_s = 0.0
+            n_tokens = 0
+            for indices in batches:
+                # Fill a partial batch by repeating its last prompt; the extra rows are discarded
+                padded = np.concatenate([indices, np.repeat(indices[-1:], args.batch_size - len(indices))])
+                start = time.perf_counter()
+                with profiler.stage("decode", items=len(indices)):
+                    out = sess.run(output, feed_dict={context: [prompt_tokens[i] for i in padded]})
+                decode_s += time.perf_counter() - start
+                n_tokens += args.length * len(indices)
+                context_length = len(prompt_tokens[indices[0]])
+                texts = [enc.decode(row[context_length:]) for row in out[:len(indices)]]
+                futures.append(pool.submit(verify, indices, texts))
+            print(f"Decoded {len(lines)} prompts with {name} in {decode_s:.1f}s.")
+            pending.append((step, name, futures, decode_s, n_tokens))
+
+        rows = []
+        for step, name, futures, decode_s, n_tokens in pending:
+            with profiler.stage("verify_wait"):
+                df = pd.concat([future.result() for future in futures]).sort_index()
+            profiler.add_items("verify_wait", len(df))
+
+            if args.save_responses is not None:
+                os.makedirs(args.save_responses, exist_ok=True)
+                with open(os.path.join(args.save_responses, f"{name}_responses.txt"), 'w') as file:
+                    file.write("\n".join(f"{prompt_texts[i]}{continuation}{args.response_end}" for i, continuation in df["continuation"].items()))
+
+            row = {"step": step, "checkpoint": name}
+            row.update(summarize_checkpoint(args.game, df))
+            row["decode_s"] = decode_s
+            row["tokens_per_s"] = n_tokens / decode_s if decode_s > 0 else None
+            rows.append(row)
+
+    table = pd.DataFrame(rows).set_index("step")
+    print(table.to_string(float_format=lambda value: f"{value:.3f}"))
+    with profiler.stage("write_results"):
+        write_table(table, output_file, args.format)
+
+    profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+
+from sparse_rewards.utils.attention import *
+
+
+class AttentionTestSuite(unittest.TestCase):
+
+    def test_position_map(self):
+        # Tokens "[WP]", "UU", "U R", "[RESPONSE]", "R'" over a prompt with 4 positions
+        strings = ["[WP]", "UU", "U R", "[RESPONSE]", "R'"]
+        text = "".join(strings)
+        spans = token_spans(strings)
+        self.assertEqual(spans.tolist(), [[0, 4], [4, 6], [6, 9], [9, 19], [19, 21]])
+
+        maps, n_found = position_map(spans, text, 4, 9, 4)
+        self.assertEqual(n_found, 4)
+        expected = np.zeros((5, 4))
+        expected[1, [0, 1]] = 0.5
+        expected[2, [2, 3]] = 0.5
+        np.testing.assert_allclose(maps, expected)
+        self.assertEqual(query_mask(spans, 19, 21).tolist(), [False, False, False, False, True])
+
+
+    def test_top_k(self):
+        attention = np.array([[0.1, 0.6, 0.3, 0.0], [1.0, 0.0, 0.0, 0.0]])
+        indices, weights = top_k(attention, 3)
+        self.assertEqual(indices.tolist(), [[1, 2, 0], [0, -1, -1]])
+        np.testing.assert_allclose(weights, [[0.6, 0.3, 0.1], [1.0, 0.0, 0.0]])
+
+
+    def test_position_attention(self):
+        # Two examples, one layer and head, three tokens mapped one-to-one onto positions
+        rng = np.random.default_rng(0)
+        attention = rng.random((2, 1, 1, 3, 3))
+        maps = np.tile(np.eye(3, dtype=np.float32), (2, 1, 1))
+        queries = np.array([[False, True, True], [False, False, True]])
+        stats = PositionAttention(1, 1, 3)
+        per_example = stats.update(attention, maps, queries)
+
+        np.testing.assert_allclose(per_example[0, 0, 0], attention[0, 0, 0, 1:].mean(axis=0), rtol=1e-6)
+        np.testing.assert_allclose(per_example[1, 0, 0], attention[1, 0, 0, 2], rtol=1e-6)
+        self.assertEqual(stats.n_queries, 3)
+        expected = (attention[0, 0, 0, 1] + attention[0, 0, 0, 2] + attention[1, 0, 0, 2]) / 3
+        np.testing.assert_allclose(stats.mean()[0, 0], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import argparse
+import os
+import tempfile
+import unittest
+import numpy as np
+
+from sparse_rewards.model.model_utils import list_checkpoints, bucket_batches
+from sparse_rewards.model.export import quantize, dequantize
+from sparse_rewards.model.generate import generate_to_file
+from sparse_rewards.utils.profiling import Profiler
+
+
+class ModelUtilsTestSuite(unittest.TestCase):
+
+    def test_list_checkpoints(self):
+        with tempfile.TemporaryDirectory() as checkpoint_path:
+            for file_name in ["model-1000.index", "model-1000.data-00000-of-00001", "model-500.index", "model-500.meta",
+                    "checkpoint", "counter", "hparams.json"]:
+                open(os.path.join(checkpoint_path, file_name), 'w').close()
+            self.assertEqual(list_checkpoints(checkpoint_path), [(500, "model-500"), (1000, "model-1000")])
+
+
+    def test_bucket_batches(self):
+        lengths = [3, 5, 3, 3, 5, 4]
+        batches = bucket_batches(lengths, 2)
+        self.assertEqual([batch.tolist() for batch in batches], [[0, 2], [3], [5], [1, 4]])
+        # Every example appears once, and every batch has a single length
+        self.assertEqual(sorted(np.concatenate(batches).tolist()), list(range(len(lengths))))
+        for batch in batches:
+            self.assertEqual(len({lengths[i] for i in batch}), 1)
+
+
+    def test_quantize(self):
+        rng = np.random.default_rng(0)
+        value = rng.normal(0, 0.02, (1, 16, 8)).astype(np.float32)
+        value[0, :, 3] = 0
+
+        # int8 is per output channel, with error at most half a quantization step
+        quantized, scale = quantize(value, "int8")
+        self.assertEqual(quantized.dtype, np.int8)
+        self.assertEqual(scale.shape, (1, 1, 8))
+        self.assertTrue((np.abs(dequantize(quantized, scale) - value) <= scale / 2 + 1e-8).all())
+        self.assertTrue((dequantize(quantized, scale)[0, :, 3] == 0).all())
+
+        # Embeddings are quantized per row
+        _, scale = quantize(value[0], "int8", channel_axis=0)
+        self.assertEqual(scale.shape, (16, 1))
+
+        quantized, scale = quantize(value, "float16")
+        self.assertIsNone(scale)
+        np.testing.assert_allclose(dequantize(quantized, scale), value, atol=1e-4)
+
+
+    def test_generate_to_file(self):
+        prompts = [f"<|startoftext|>[WP]{i}[RESPONSE]" for i in range(5)]
+        args = argparse.Namespace(save_every=2, verbose=False)
+
+        def decode(indices):
+            # Two samples per prompt, continuing past the end token
+            return [[f"{prompts[i]} {i}.{j}<|endoftext|>extra" for j in range(2)] for i in indices]
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, "responses.txt")
+
+            def read_output():
+                with open(output_file, 'r') as file:
+                    return file.read().split("\n")
+
+            # Batches out of order; lines are written in prompt order
+            generate_to_file(prompts, [[3, 1], [0], [4, 2]], decode, output_file, args, Profiler("test", args))
+            lines = read_output()
+            self.assertEqual(len(lines), 10)
+            self.assertEqual(lines[0], "<|startoftext|>[WP]0[RESPONSE] 0.0<|endoftext|>")
+            self.assertEqual(lines[9], "<|startoftext|>[WP]4[RESPONSE] 4.1<|endoftext|>")
+
+            # Lines are saved every two prompts, and interrupting keeps the lines finished so far
+            def interrupted(indices):
+                if 2 in indices:
+                    self.assertEqual(len(read_output()), 4)
+                    raise KeyboardInterrupt
+                return decode(indices)
+
+            generate_to_file(prompts, [[0], [1], [2], [3]], interrupted, output_file, args, Profiler("test", args))
+            self.assertEqual([line.split("]")[-1] for line in read_output()[::2]], [" 0.0<|endoftext|>", " 1.0<|endoftext|>"])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,168 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+import pycuber as pc
+import random
+
+import numpy as np
+
+from sparse_rewards.utils.rubiks_utils import *
+from sparse_rewards.utils.facelets import configs_to_array, array_to_configs, encode_formulas, apply_moves, is_solved, SOLVED_CONFIG
+from sparse_rewards.model.eval_rubiks_output import evaluate, prefix_matches, summarize, write_table
+
+
+class RubiksTestSuite(unittest.TestCase):
+
+    def test_cube_to_config_1(self):
+        # 100 random test cases
+        for _ in range(100):
+            # Create new cube
+            cube = pc.Cube()
+            # Create random formula
+            formula = gen_init_config(random.randint(1, 20))
+            # Apply formula to cube
+            cube(formula)
+            # Get config string for cube
+            config = cube_to_config(cube)
+            # Use config string to build second cube
+            cube2 = config_to_cube(config)
+
+            # Assert that cubes are identical
+            self.assertEqual(cube, cube2)
+
+    
+    def test_config_to_cube_1(self):
+        # Test with 100 random formulas
+        for _ in range(100):
+            formula = pc.Formula().random(random.randint(1, 10))
+            cube1 = pc.Cube()
+            cube2 = config_to_cube("UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDBBBBBBBBBLLLLLLLLL")
+            self.assertEqual(cube1, cube2)
+
+            # Apply formula to both cubes
+            cube1(formula)
+            cube2(formula)
+
+            self.assertEqual(cube1, cube2)
+
+    
+    def test_config_to_cube_2(self):
+        # Create random configs from random cubes and ensure that the resulting cubes are valid (solvable)
+        # Test with 100 random formulas
+        for _ in range(100):
+            formula = pc.Formula().random(random.randint(1, 20))
+            cube = pc.Cube()
+            cube(formula)
+            config = cube_to_config(cube)
+            # Build second cube directly from this config string
+            cube2 = config_to_cube(config)
+            # Ensure this second cube is valid
+            self.assertTrue(cube2.is_valid())
+
+
+    def test_facelets_apply_moves(self):
+        # Facelet model agrees with pycuber on 100 random formulas applied to the solved cube
+        formulas = [gen_init_config(random.randint(1, 20)) for _ in range(100)]
+        states, parsed = configs_to_array([SOLVED_CONFIG] * len(formulas))
+        moves, lengths, valid_prefix = encode_formulas(formulas)
+        self.assertTrue(parsed.all())
+        self.assertTrue((valid_prefix == lengths).all())
+        for formula, config in zip(formulas, array_to_configs(apply_moves(states, moves))):
+            cube = pc.Cube()
+            cube(formula)
+            self.assertEqual(config, cube_to_config(cube))
+
+        # Applying the inverse formula solves the cube
+        inverses = [str(pc.Formula(formula).reverse()) for formula in formulas]
+        solved = apply_moves(apply_moves(states, moves), encode_formulas(inverses)[0])
+        self.assertTrue(is_solved(solved).all())
+
+
+
+    def test_evaluate(self):
+        # Bulk evaluation agrees with eval_line on face turns, slice/wide moves (pycuber fallback) and unparseable tokens
+        prompts, responses = [], []
+        for scramble in ["R U", "R U M", "F r'", "L2 D'"]:
+            cube = pc.Cube()
+            cube(scramble)
+            prompts.append(cube_to_config(cube))
+            responses.append(str(pc.Formula(scramble).reverse()))
+        prompts += [prompts[0], prompts[0], prompts[1], None]
+        responses += ["U' R", "U' X R'", "M U", "U"]
+        df = evaluate(prompts, responses)
+        self.assertEqual(list(df["result"]), ["Correct"] * 4 + ["Incorrect", "Invalid", "Incorrect", "Invalid"])
+        for prompt, response, result in zip(prompts[:-1], responses[:-1], df["result"][:-1]):
+            self.assertEqual(result, eval_line(prompt, response))
+        self.assertEqual(list(df["response_length"]), [2, 3, 2, 2, 2, 3, 2, 1])
+        # Fallback responses count as fully applied; an unparseable token ends the valid prefix
+        self.assertEqual(list(df["valid_prefix"][:6]), [2, 3, 2, 2, 2, 1])
+        self.assertTrue((df["correct_facelets"][:4] == 54).all())
+        self.assertTrue((df["correct_facelets"][4:7] < 54).all())
+        self.assertTrue(np.isnan(df["correct_facelets"][7]))
+
+
+    def test_evaluate_references(self):
+        cube = pc.Cube()
+        cube("R U M")
+        prompt = cube_to_config(cube)
+        responses = ["M' U' R'", "M' U R", "M' U' R' U U'", "M' U' R'"]
+        references = ["M' U' R'", "M' U' R'", "M' U' R'", None]
+        df = evaluate([prompt] * 4, responses, references)
+        self.assertEqual(list(df["result"]), ["Correct", "Incorrect", "Correct", "Correct"])
+        self.assertEqual(list(df["reference_length"][:3]), [3, 3, 3])
+        self.assertEqual(list(df["reference_prefix"][:3]), [3, 1, 3])
+        self.assertEqual(list(df["length_ratio"][:3]), [1.0, 1.0, 5 / 3])
+        # Lines without a reference have no reference metrics
+        self.assertTrue(df[["reference_length", "reference_prefix", "length_ratio"]].iloc[3].isna().all())
+
+
+    def test_prefix_matches(self):
+        moves, lengths, valid = encode_formulas(["R U F", "R U F", "R U", "U R", "R X F", ""])
+        reference_moves, _, reference_valid = encode_formulas(["R U F D"] * 6)
+        self.assertEqual(list(prefix_matches(moves, valid, reference_moves, reference_valid)), [3, 3, 2, 0, 1, 0])
+        # A reference shorter than the formula limits the match
+        short_moves, _, short_valid = encode_formulas(["R"] * 6)
+        self.assertEqual(list(prefix_matches(moves, valid, short_moves, short_valid)), [1, 1, 1, 0, 1, 0])
+
+
+    def test_summarize(self):
+        cube = pc.Cube()
+        cube("R U")
+        prompt = cube_to_config(cube)
+        df = evaluate([prompt] * 5, ["U' R'", "U' R'", "U' R", "X", "U' R' U U'"], ["U' R'"] * 5)
+        df["scramble_length"] = [2, 2, 3, 3, np.nan]
+        summary = summarize(df, "scramble_length")
+        self.assertEqual(list(summary.index), ["all", "2", "3", "nan"])
+        self.assertEqual(list(summary["n"]), [5, 2, 2, 1])
+        self.assertEqual(list(summary["correct"]), [0.6, 1.0, 0.0, 1.0])
+        self.assertEqual(list(summary["invalid"]), [0.2, 0.0, 0.5, 0.0])
+        # Length ratio is averaged over correct responses only
+        self.assertEqual(summary.loc["all", "length_ratio_correct"], 4 / 3)
+        self.assertEqual(summary.loc["2", "reference_prefix"], 2.0)
+        self.assertTrue(np.isnan(summary.loc["3", "length_ratio_correct"]))
+        self.assertEqual(list(summarize(df).index), ["all"])
+
+        # Grouping by reference length (the default with --reference only) keeps the index apart from the column
+        summary = summarize(df, "reference_length")
+        self.assertEqual(summary.index.name, "by_reference_length")
+        self.assertEqual(list(summary.index), ["all", "2"])
+        formats = ["csv", "json"]
+        if importlib.util.find_spec("pyarrow") or importlib.util.find_spec("fastparquet"):
+            formats.append("parquet")
+        with tempfile.TemporaryDirectory() as directory:
+            for format in formats:
+                path = os.path.join(directory, f"summary.{format}")
+                write_table(summary, path, format)
+                self.assertTrue(os.path.getsize(path) > 0)
+            with open(os.path.join(directory, "summary.csv"), 'r') as file:
+                header = file.readline().strip().split(",")
+            self.assertEqual(header.count("reference_length"), 1)
+            with open(os.path.join(directory, "summary.json"), 'r') as file:
+                records = json.load(file)
+            self.assertEqual([record["by_reference_length"] for record in records], ["all", "2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
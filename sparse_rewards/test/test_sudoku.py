@@ -0,0 +1,93 @@
+import unittest
+import numpy as np
+import random
+
+from sparse_rewards.utils.sudoku_utils import *
+
+PUZZLE = "095004010102807300000090657000000073000320506980006000008260009600705008040901200"
+SOLUTION = "795634812162857394834192657256418973471329586983576421518263749629745138347981265"
+
+
+class SudokuTestSuite(unittest.TestCase):
+
+    def test_strings_to_boards_1(self):
+        # Boards survive a round trip through strings
+        boards, parsed = strings_to_boards([PUZZLE, SOLUTION])
+        self.assertTrue(parsed.all())
+        self.assertEqual(boards.shape, (2, 9, 9))
+        self.assertEqual(boards_to_strings(boards), [PUZZLE, SOLUTION])
+
+
+    def test_strings_to_boards_2(self):
+        # Malformed strings are flagged and left empty
+        boards, parsed = strings_to_boards([SOLUTION[:80], SOLUTION[:80] + "x", None, SOLUTION])
+        self.assertEqual(parsed.tolist(), [False, False, False, True])
+        self.assertFalse(boards[:3].any())
+
+
+    def test_check_boards_1(self):
+        # Reference solution is accepted
+        prompts, _ = strings_to_boards([PUZZLE])
+        responses, _ = strings_to_boards([SOLUTION])
+        checks = check_boards(prompts, responses)
+        self.assertTrue(all(check[0] for check in checks.values()))
+        self.assertFalse(cell_conflicts(responses).any())
+
+
+    def test_check_boards_2(self):
+        # Swapping two cells in a row keeps rows valid but breaks columns and givens
+        prompts, _ = strings_to_boards([PUZZLE])
+        responses, _ = strings_to_boards([SOLUTION])
+        responses[0, 0, 1], responses[0, 0, 2] = responses[0, 0, 2], responses[0, 0, 1]
+        checks = check_boards(prompts, responses)
+        self.assertTrue(checks["rows"][0])
+        self.assertFalse(checks["columns"][0])
+        self.assertFalse(checks["givens"][0])
+        self.assertFalse(checks["solved"][0])
+        self.assertEqual(int(cell_conflicts(responses).sum()), 4)
+
+
+    def test_check_boards_3(self):
+        # Responses with empty cells are never solved
+        prompts, _ = strings_to_boards([PUZZLE])
+        checks = check_boards(prompts, prompts)
+        self.assertTrue(checks["givens"][0])
+        self.assertFalse(checks["solved"][0])
+
+
+    def test_cell_conflicts(self):
+        # Matches a cell-by-cell check on random boards with repeats and empty cells
+        boards = np.random.default_rng(0).integers(0, 10, size=(20, 9, 9), dtype=np.uint8)
+        conflicts = cell_conflicts(boards)
+        for n, r, c in np.ndindex(boards.shape):
+            d = boards[n, r, c]
+            box = boards[n, r // 3 * 3:r // 3 * 3 + 3, c // 3 * 3:c // 3 * 3 + 3]
+            expected = d == 0 or (boards[n, r] == d).sum() > 1 or (boards[n, :, c] == d).sum() > 1 or (box == d).sum() > 1
+            self.assertEqual(conflicts[n, r, c], expected)
+
+
+    def test_solve_1(self):
+        # Solver recovers the reference solution and reports it as unique
+        puzzle = [int(c) for c in PUZZLE]
+        n_solutions, solution, _ = solve(puzzle, limit=2)
+        self.assertEqual(n_solutions, 1)
+        self.assertEqual("".join(map(str, solution)), SOLUTION)
+
+
+    def test_generate_puzzle_1(self):
+        # Generated puzzles have a unique solution equal to the generating board
+        rng = random.Random(0)
+        for _ in range(10):
+            solution = generate_solution(rng)
+            boards, _ = strings_to_boards(["".join(map(str, solution))])
+            self.assertTrue(check_boards(np.zeros_like(boards), boards)["solved"][0])
+
+            puzzle = generate_puzzle(solution, 25, rng)
+            self.assertGreaterEqual(N_CELLS - puzzle.count(0), 25)
+            n_solutions, found, _ = solve(puzzle, limit=2)
+            self.assertEqual(n_solutions, 1)
+            self.assertEqual(found, solution)
+
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file
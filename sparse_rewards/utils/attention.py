@@ -0,0 +1,94 @@
+"""Helpers for analysing attention maps: mapping tokens to board positions, top-k reduction and streaming statistics.
+
+Attention arrays have shape (batch, layers, heads, query tokens, key tokens), as produced by extract_attention.
+"""
+
+import numpy as np
+
+
+def token_spans(token_strings):
+    """Given the decoded string of each token of a text, return an (T, 2) array of (start, end) character offsets."""
+
+    ends = np.cumsum([len(string) for string in token_strings], dtype=np.int64)
+    starts = ends - np.array([len(string) for string in token_strings], dtype=np.int64)
+    return np.stack([starts, ends], axis=1).reshape(-1, 2)
+
+
+def position_map(spans, text, start, end, n_positions):
+    """Map tokens to board positions (facelets or cells).
+
+    Positions are the non-space characters of text[start:end], in order. A token covering several positions has its
+    attention shared equally between them.
+
+    Returns:
+        A tuple (matrix, n_found) where matrix is a (T, n_positions) float32 array whose row t gives the fraction of
+        attention to token t assigned to each position, and n_found is the number of positions found in the text.
+    """
+
+    chars = [i for i in range(start, end) if not text[i].isspace()][:n_positions]
+    char_positions = np.full(len(text), -1, dtype=np.int64)
+    char_positions[chars] = np.arange(len(chars))
+    matrix = np.zeros((len(spans), n_positions), dtype=np.float32)
+    for t, (token_start, token_end) in enumerate(spans):
+        positions = char_positions[token_start:token_end]
+        positions = positions[positions >= 0]
+        if len(positions) > 0:
+            matrix[t, positions] = 1.0 / len(positions)
+    return matrix, len(chars)
+
+
+def query_mask(spans, start, end):
+    """Return a (T,) boolean array marking tokens which start within text[start:end] (e.g. the response)."""
+
+    return (spans[:, 0] >= start) & (spans[:, 0] < end)
+
+
+def top_k(attention, k):
+    """Reduce attention to the k largest weights of each query token.
+
+    Returns:
+        A tuple (indices, weights) of arrays of shape attention.shape[:-1] + (k,), largest weight first. Where a query has
+        fewer than k non-zero weights (e.g. early tokens under the causal mask), the remaining indices are -1.
+    """
+
+    k = min(k, attention.shape[-1])
+    indices = np.argpartition(-attention, k - 1, axis=-1)[..., :k]
+    weights = np.take_along_axis(attention, indices, axis=-1)
+    order = np.argsort(-weights, axis=-1, kind="stable")
+    indices = np.take_along_axis(indices, order, axis=-1)
+    weights = np.take_along_axis(weights, order, axis=-1)
+    indices[weights == 0] = -1
+    return indices, weights
+
+
+class PositionAttention:
+    """Streaming mean of the attention paid by query tokens (e.g. response moves) to each board position, per layer and head."""
+
+    def __init__(self, n_layers, n_heads, n_positions):
+        self.total = np.zeros((n_layers, n_heads, n_positions), dtype=np.float64)
+        self.n_queries = 0
+
+    def update(self, attention, maps, queries):
+        """Add a batch.
+
+        Args:
+            attention: Array of shape (B, layers, heads, T, T).
+            maps: Array of shape (B, T, n_positions) from position_map.
+            queries: Boolean array of shape (B, T) from query_mask.
+
+        Returns:
+            A (B, layers, heads, n_positions) float32 array of the mean attention to each position from each example's
+            query tokens.
+        """
+
+        from_queries = np.einsum("blhqk,bq->blhk", attention, queries.astype(attention.dtype))
+        per_example = np.einsum("blhk,bkp->blhp", from_queries, maps.astype(attention.dtype))
+        self.total += per_example.sum(axis=0)
+        counts = queries.sum(axis=1)
+        self.n_queries += int(counts.sum())
+        return (per_example / np.maximum(counts, 1)[:, None, None, None]).astype(np.float32)
+
+    def mean(self):
+        """Return the (layers, heads, n_positions) mean attention to each position over all query tokens seen."""
+
+        return self.total / max(self.n_queries, 1)
\ No newline at end of file
@@ -0,0 +1,24 @@
+"""Utility functions for parsing prompt-response lines, shared by the games."""
+
+import re
+
+
+def line_pattern(prompt_start="<|startoftext|>[WP]", response_start="[RESPONSE]", response_end="<|endoftext|>"):
+    """Return a compiled regex matching a prompt-response line, capturing prompt and response."""
+
+    return re.compile(f"{re.escape(prompt_start)}(.*?){re.escape(response_start)}(.*){re.escape(response_end)}")
+
+
+def parse_line(line, pattern):
+    """Parse a prompt-response line using a pattern from line_pattern().
+
+    Returns:
+        A tuple containing the prompt and the response, with surrounding whitespace removed, or (None, None) if the
+        line does not match.
+    """
+
+    match = pattern.match(line.strip())
+    if match:
+        return (match.group(1).strip(), match.group(2).strip())
+    else:
+        return (None, None)
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""Fast, vectorized Rubik's cube model operating directly on facelet config strings.
+
+A cube state is a row of 54 face letters in the standard traversal order used by rubiks_utils (faces URFDBL, 9 facelets
+each). Each of the 18 face turns is a fixed permutation of the 54 positions, so a batch of cubes of shape (N, 54) can be
+turned with a single gather per move. Only face turns are supported; formulas containing other moves (slices, wide
+turns, rotations) should be handled with pycuber instead.
+"""
+
+import numpy as np
+
+FACES = ["U", "R", "F", "D", "B", "L"]
+N_FACELETS = 54
+SOLVED_CONFIG = "".join(face * 9 for face in FACES)
+
+# Outward normal, and directions of the top row and right-hand column, for each face in standard traversal order
+_FACE_AXES = {
+    "U": ((0, 1, 0), (0, 0, -1), (1, 0, 0)),
+    "R": ((1, 0, 0), (0, 1, 0), (0, 0, -1)),
+    "F": ((0, 0, 1), (0, 1, 0), (1, 0, 0)),
+    "D": ((0, -1, 0), (0, 0, 1), (1, 0, 0)),
+    "B": ((0, 0, -1), (0, 1, 0), (-1, 0, 0)),
+    "L": ((-1, 0, 0), (0, 1, 0), (0, 0, 1)),
+}
+
+
+def _facelet_positions():
+    """Return a list of (cubie position, normal) for each of the 54 facelets in standard traversal order."""
+
+    positions = []
+    for face in FACES:
+        normal, up, right = (np.array(v) for v in _FACE_AXES[face])
+        for row in range(3):
+            for col in range(3):
+                cubie = normal + up * (1 - row) + right * (col - 1)
+                positions.append((tuple(cubie), tuple(normal)))
+    return positions
+
+
+def _turn_permutation(face):
+    """Return perm such that state[:, perm] is state after a clockwise quarter turn of face."""
+
+    positions = _facelet_positions()
+    index = {position: i for i, position in enumerate(positions)}
+    axis = np.array(_FACE_AXES[face][0])
+    perm = np.arange(N_FACELETS)
+    for i, (cubie, normal) in enumerate(positions):
+        if np.dot(cubie, axis) != 1:
+            continue
+        # Clockwise (seen from outside the face) is a -90 degree rotation about the outward normal: v -> a(a.v) - a x v
+        rotate = lambda v: tuple(axis * np.dot(axis, v) - np.cross(axis, v))
+        perm[index[(rotate(cubie), rotate(normal))]] = i
+    return perm
+
+
+def _build_moves():
+    """Build the move table: names of the 18 face turns (plus aliases) and their permutations."""
+
+    names = []
+    perms = []
+    for face in FACES:
+        quarter = _turn_permutation(face)
+        half = quarter[quarter]
+        for suffix, perm in [("", quarter), ("2", half), ("'", half[quarter])]:
+            names.append(face + suffix)
+            perms.append(perm)
+    # Index len(names) is the identity, used to pad formulas of different lengths
+    perms.append(np.arange(N_FACELETS))
+    move_index = {name: i for i, name in enumerate(names)}
+    # pycuber also accepts "i" for a prime and a primed half turn, which is the same as a half turn
+    for face in FACES:
+        move_index[face + "i"] = move_index[face + "'"]
+        move_index[face + "2'"] = move_index[face + "2"]
+        move_index[face + "2i"] = move_index[face + "2"]
+    return names, move_index, np.array(perms, dtype=np.intp)
+
+
+MOVES, MOVE_INDEX, PERMS = _build_moves()
+PAD = len(MOVES)
+FACE_CODES = np.full(256, 255, dtype=np.uint8)
+for _i, _face in enumerate(FACES):
+    FACE_CODES[ord(_face)] = _i
+
+
+def is_move(token):
+    """Return True if pycuber accepts token as a move: a face turn, slice, wide turn or rotation (mirrors pycuber.Step)."""
+
+    if len(token) >= 2 and token[1] == "w":
+        token = token[0].lower() + token[2:]
+    token = token.replace("i", "'")
+    if token[1:] == "2'":
+        token = token[0] + "2"
+    return len(token) > 0 and token[0] in "LUFDRBMSElufdrbxyz" and token[1:] in ["", "'", "2"]
+
+
+def configs_to_array(configs):
+    """Given a list of config strings, produce an (N, 54) uint8 array of face indices.
+
+    Returns:
+        A tuple (states, parsed) where parsed marks configs which are exactly 54 face letters (spaces are ignored).
+        Rows of malformed configs are left as the solved cube.
+    """
+
+    n = len(configs)
+    states = np.tile(FACE_CODES[np.frombuffer(SOLVED_CONFIG.encode(), dtype=np.uint8)], (n, 1))
+    cleaned = [config.replace(" ", "") if config else "" for config in configs]
+    parsed = np.array([len(config) == N_FACELETS for config in cleaned], dtype=bool)
+    if parsed.any():
+        joined = "".join(config for config, ok in zip(cleaned, parsed) if ok).encode("ascii", errors="replace")
+        codes = FACE_CODES[np.frombuffer(joined, dtype=np.uint8)].reshape(-1, N_FACELETS)
+        is_faces = (codes != 255).all(axis=1)
+        rows = np.flatnonzero(parsed)
+        states[rows[is_faces]] = codes[is_faces]
+        parsed[rows[~is_faces]] = False
+    return states, parsed
+
+
+def array_to_configs(states):
+    """Given an (N, 54) array of face indices, return a list of config strings."""
+
+    letters = np.frombuffer("".join(FACES).encode(), dtype=np.uint8)[states]
+    joined = letters.tobytes().decode("ascii")
+    return [joined[i:i + N_FACELETS] for i in range(0, len(joined), N_FACELETS)]
+
+
+def encode_formulas(formulas):
+    """Encode whitespace-separated formulas as a padded (N, max_length) array of move indices.
+
+    Returns:
+        A tuple (moves, lengths, valid_prefix) where lengths holds the number of tokens in each formula and valid_prefix
+        the number of leading tokens which are face turns. Moves after the first unsupported token are padding.
+    """
+
+    tokenized = [formula.split() if formula else [] for formula in formulas]
+    lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.int64)
+    moves = np.full((len(tokenized), max(lengths.max(initial=0), 1)), PAD, dtype=np.intp)
+    valid_prefix = lengths.copy()
+    for i, tokens in enumerate(tokenized):
+        for j, token in enumerate(tokens):
+            move = MOVE_INDEX.get(token)
+            if move is None:
+                valid_prefix[i] = j
+                break
+            moves[i, j] = move
+    return moves, lengths, valid_prefix
+
+
+def apply_moves(states, moves):
+    """Apply padded move sequences (from encode_formulas) to an (N, 54) batch of states, returning new states."""
+
+    states = states.copy()
+    for t in range(moves.shape[1]):
+        column = moves[:, t]
+        active = column != PAD
+        if not active.any():
+            break
+        states[active] = np.take_along_axis(states[active], PERMS[column[active]], axis=1)
+    return states
+
+
+def correct_facelets(states):
+    """Return the number of facelets on each cube which match the centre of their face (54 when solved)."""
+
+    faces = states.reshape(-1, 6, 9)
+    return (faces == faces[:, :, 4:5]).sum(axis=(1, 2))
+
+
+def is_solved(states):
+    """Return an (N,) boolean array marking solved cubes (every face a single colour)."""
+
+    return correct_facelets(states) == N_FACELETS
\ No newline at end of file
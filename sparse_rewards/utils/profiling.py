@@ -0,0 +1,229 @@
+"""Lightweight per-stage timing, throughput and memory instrumentation for the command line scripts."""
+
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as None
+    resource = None
+
+
+
+def add_profiling_args(parser):
+    """Add the shared instrumentation arguments to an argparse parser."""
+
+    parser.add_argument("--timing_report", default=None,
+        help="Name of file to write per-stage timing, throughput and peak memory to in JSON format (default: print summary only).")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], default=None,
+        help="Also profile the run with cProfile or a lightweight stack-sampling profiler (default: off).")
+    parser.add_argument("--profile_output", default=None,
+        help="Name of file to write profile to (default <script>.prof for cprofile, <script>_stacks.txt for sample).")
+    parser.add_argument("--sample_interval", type=float, default=0.005, help="Seconds between stack samples for --profile sample (default 0.005).")
+
+
+def peak_rss_mb(children=False):
+    """Return the peak resident set size of this process in MB, or None if unavailable.
+
+    With children=True, return the peak of the largest terminated child process (e.g. a multiprocessing worker) instead.
+    """
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / 2**20
+    return peak / 2**10
+
+
+def children_cpu_time():
+    """Return the user and system CPU seconds used by terminated child processes which have been waited for.
+
+    Multiprocessing pool workers are counted once the pool has been closed or terminated.
+    """
+
+    times = os.times()
+    return times.children_user + times.children_system
+
+
+def process_elapsed():
+    """Return the number of seconds since this process started, or None if it cannot be determined (non-Linux)."""
+
+    try:
+        with open("/proc/self/stat", 'r') as file:
+            # Fields after the parenthesised command name start at field 3 (state); starttime is field 22
+            fields = file.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", 'r') as file:
+            uptime = float(file.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# Wall time at process start (or at first import of this module if unknown), used to time script startup and heavy
+# imports; CPU time is measured from process start by time.process_time()
+START_WALL = time.perf_counter() - (process_elapsed() or 0.0)
+START_CPU = 0.0
+START_CHILDREN_CPU = children_cpu_time()
+
+
+class StackSampler:
+    """Sample the stack of a thread at a fixed interval and count collapsed stacks (flamegraph 'folded' format)."""
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        """Collect samples until stopped."""
+
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self):
+        """Start sampling in a background thread."""
+
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the background thread to exit."""
+
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        """Write one line per collapsed stack with its sample count, most frequent first."""
+
+        with open(path, 'w') as file:
+            for stack, count in self.counts.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """Record wall time, CPU time and item counts for named stages of a run.
+
+    Stages entered repeatedly (e.g. once per sample) are accumulated under the same name. CPU time of this process and of
+    child processes finished during a stage (e.g. the workers of a Pool closed inside it) are recorded separately.
+    """
+
+    def __init__(self, name, args=None):
+        self.name = name
+        self.stages = {}
+        self.report_file = getattr(args, "timing_report", None)
+        self.profile = getattr(args, "profile", None)
+        self.profile_output = getattr(args, "profile_output", None)
+        self._sampler = None
+        self._cprofile = None
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+        # Everything between process start and creating the profiler (interpreter startup, imports, argument parsing) is
+        # script startup
+        self.record("startup", self._start_wall - START_WALL, self._start_cpu - START_CPU)
+
+        if self.profile == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        elif self.profile == "sample":
+            self._sampler = StackSampler(getattr(args, "sample_interval", 0.005))
+            self._sampler.start()
+
+    def record(self, stage, wall, cpu, items=0, children_cpu=0.0):
+        """Add a measurement to a stage."""
+
+        entry = self.stages.setdefault(stage, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "children_cpu_s": 0.0, "items": 0})
+        entry["calls"] += 1
+        entry["wall_s"] += wall
+        entry["cpu_s"] += cpu
+        entry["children_cpu_s"] += children_cpu
+        entry["items"] += items
+
+    @contextmanager
+    def stage(self, stage, items=0):
+        """Context manager timing the enclosed block as (part of) a stage which processes the given number of items."""
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        start_children_cpu = children_cpu_time()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start_wall, time.process_time() - start_cpu, items,
+                children_cpu_time() - start_children_cpu)
+
+    def add_items(self, stage, items):
+        """Add to the item count of a stage without timing anything."""
+
+        self.stages.setdefault(stage, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "children_cpu_s": 0.0, "items": 0})["items"] += items
+
+    def report(self):
+        """Return a dict with per-stage and total timings, throughput and peak memory, of this process and of its children."""
+
+        stages = {}
+        for stage, entry in self.stages.items():
+            stages[stage] = dict(entry)
+            stages[stage]["items_per_s"] = entry["items"] / entry["wall_s"] if entry["items"] and entry["wall_s"] > 0 else None
+        return {
+            "name": self.name,
+            "argv": sys.argv,
+            "stages": stages,
+            "total_wall_s": time.perf_counter() - START_WALL,
+            "total_cpu_s": time.process_time() - START_CPU,
+            "total_children_cpu_s": children_cpu_time() - START_CHILDREN_CPU,
+            "peak_rss_mb": peak_rss_mb(),
+            "children_peak_rss_mb": peak_rss_mb(children=True),
+        }
+
+    def finish(self):
+        """Stop any profiler, print a per-stage summary and write the JSON report if requested.
+
+        Returns:
+            The report dict.
+        """
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            path = self.profile_output or f"{self.name}.prof"
+            self._cprofile.dump_stats(path)
+            print(f"Wrote cProfile stats to {path}.", file=sys.stderr)
+        if self._sampler is not None:
+            self._sampler.stop()
+            path = self.profile_output or f"{self.name}_stacks.txt"
+            self._sampler.write(path)
+            print(f"Wrote sampled stacks to {path}.", file=sys.stderr)
+
+        report = self.report()
+        for stage, entry in report["stages"].items():
+            rate = f", {entry['items_per_s']:.2f} items/s" if entry["items_per_s"] is not None else ""
+            children = f" (+{entry['children_cpu_s']:.3f}s cpu in child processes)" if entry["children_cpu_s"] > 0 else ""
+            print(f"[timing] {stage}: {entry['wall_s']:.3f}s wall, {entry['cpu_s']:.3f}s cpu{children}{rate}", file=sys.stderr)
+        peak = f"{report['peak_rss_mb']:.1f} MB" if report["peak_rss_mb"] is not None else "n/a"
+        children = ""
+        if report["total_children_cpu_s"] > 0:
+            children_peak = f"{report['children_peak_rss_mb']:.1f} MB" if report["children_peak_rss_mb"] is not None else "n/a"
+            children = f"; child processes: {report['total_children_cpu_s']:.3f}s cpu, peak RSS {children_peak}"
+        print(f"[timing] total: {report['total_wall_s']:.3f}s wall, {report['total_cpu_s']:.3f}s cpu, peak RSS {peak}{children}",
+            file=sys.stderr)
+
+        if self.report_file is not None:
+            with open(self.report_file, 'w') as file:
+                json.dump(report, file, indent=4)
+        return report
\ No newline at end of file
@@ -1,23 +1,22 @@
 """Visualize Rubik's cube solutions using cube.rider.biz."""
 
-import wget
 import argparse
-from PIL import Image
 import os
-import sys
-
-sys.path.insert(0, "src/utils")
-from rubiks_utils import *
 
 DEFAULT_CONFIG = "UUUUUUUUURRRRRRRRRFFFFFFFFFDDDDDDDDDBBBBBBBBBLLLLLLLLL"
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--formula", help="String representation of rubik's formula from which to generate a gif. Individual steps should be separated by whitespace.")
-parser.add_argument("--config", help="Initial configuration of cube that formula acts on (defaults to completed cube state).", default=DEFAULT_CONFIG)
-parser.add_argument("--output", help="Name of file to write GIF to (default cube.gif).", default="cube.gif")
-parser.add_argument("--duration", type=int, help="Desired GIF frame duration in ms (default 300).", default=300)
-parser.add_argument("--repeat-last", help="Number of times to repeat last frame (default 0).", type=int, default=0)
-args = parser.parse_args()
+
+def build_parser(parser=None):
+    """Add arguments for this command to parser (or to a new parser) and return it."""
+
+    if parser is None:
+        parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--formula", help="String representation of rubik's formula from which to generate a gif. Individual steps should be separated by whitespace.")
+    parser.add_argument("--config", help="Initial configuration of cube that formula acts on (defaults to completed cube state).", default=DEFAULT_CONFIG)
+    parser.add_argument("--output", help="Name of file to write GIF to (default cube.gif).", default="cube.gif")
+    parser.add_argument("--duration", type=int, help="Desired GIF frame duration in ms (default 300).", default=300)
+    parser.add_argument("--repeat-last", help="Number of times to repeat last frame (default 0).", type=int, default=0)
+    return parser
 
 
 def get_cube_image(config, formula=None):
@@ -26,6 +25,8 @@ def get_cube_image(config, formula=None):
     Returns name of the file where image is stored.
     """
 
+    import wget
+
     url = f"http://cube.rider.biz/visualcube.png?fmt=svg&size=350&pzl=3&fd={config.lower()}"
     if formula is not None:
         # Remove whitespace from formula
@@ -35,9 +36,11 @@ def get_cube_image(config, formula=None):
     return image
 
 
-def formula_to_gif(init_config, formula):
+def formula_to_gif(init_config, formula, output="cube.gif", duration=300, repeat_last=0):
     """Given a Rubik's formula and initial cube configuration, create a gif of the cube as the formula is applied."""
 
+    from PIL import Image
+
     # Split formula into steps
     formula_steps = formula.split()
 
@@ -61,18 +64,21 @@ def formula_to_gif(init_config, formula):
     for image_file in image_files:
         frames.append(Image.open(image_file))
 
-    for i in range(args.repeat_last):
+    for i in range(repeat_last):
         frames.append(Image.open(image_files[-1]))
 
-    frames[0].save(args.output, format='GIF', append_images=frames[1:], save_all=True, duration=args.duration, loop=0)
+    frames[0].save(output, format='GIF', append_images=frames[1:], save_all=True, duration=duration, loop=0)
 
     # Delete all image files used to create gif
     for image_file in image_files:
         os.remove(image_file)
 
 
-def main():
-    formula_to_gif(args.config, args.formula)
+def main(args=None):
+    if args is None:
+        args = build_parser().parse_args()
+
+    formula_to_gif(args.config, args.formula, args.output, args.duration, args.repeat_last)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
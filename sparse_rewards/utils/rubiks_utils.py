@@ -4,6 +4,7 @@ import pycuber as pc
 from pycuber import Corner, Edge, Centre, Square
 from pycuber.solver import CFOPSolver
 import random
+from contextlib import nullcontext
 
 
 # Rubik's constants
@@ -128,4 +129,51 @@ def gen_response(cube):
 
     solver = CFOPSolver(cube)
     response = str(solver.solve(suppress_progress_messages=True).optimise())
-    return response
\ No newline at end of file
+    return response
+
+
+def gen_sample(length, profiler=None):
+    """Generate a random cube configuration of the specified scramble length and its CFOP solution.
+
+    Args:
+        profiler: Optional Profiler to time the "scramble" and "solve" stages with.
+
+    Returns:
+        A tuple containing the initial configuration string, the response formula and the scramble formula.
+    """
+
+    stage = profiler.stage if profiler is not None else (lambda name, items=0: nullcontext())
+    with stage("scramble", items=1):
+        config = gen_init_config(length)
+        cube = pc.Cube()
+        cube(config)
+        prompt = cube_to_config(cube)
+    with stage("solve", items=1):
+        response = gen_response(cube)
+    return (prompt, response, config)
+
+
+def eval_line(prompt, response):
+    """Evaluates a single prompt-response pair.
+    
+    Returns:
+        "Correct" if the generated response produces a solved cube from the intial configuration, "Incorrect" if it is valid but does not
+        produce a solved cube, and "Invalid" if the response is an invalid formula or otherwise does not match the standard response format.
+    """
+
+    if prompt and response:
+        # Set initial cube config
+        cube = config_to_cube(prompt)
+
+        try:
+            # Apply response formula
+            cube(response)
+        except ValueError as e:
+            return "Invalid"
+        # Check if cube is solved
+        if is_correct(cube):
+            return "Correct"
+        else:
+            return "Incorrect"
+    else:
+        return "Invalid"
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""Utility functions for processing Sudoku data.
+
+Boards are handled in batches as (N, 9, 9) uint8 NumPy arrays, with 0 marking an empty cell. The solver and generator
+work on a single board at a time as a flat list of 81 ints, tracking used digits per row, column and box as bitmasks.
+"""
+
+import numpy as np
+
+
+# Sudoku constants
+SIZE = 9
+BOX_SIZE = 3
+N_CELLS = SIZE * SIZE
+# Bitmask with bits 1-9 set, i.e. a row/column/box containing every digit exactly once
+FULL_MASK = sum(1 << d for d in range(1, SIZE + 1))
+# Bitmask representation of digits 0-9 (digit d -> 1 << d)
+DIGIT_BITS = (1 << np.arange(SIZE + 1)).astype(np.uint16)
+# Row, column and box index of each cell in a flat board
+ROW_OF = [i // SIZE for i in range(N_CELLS)]
+COL_OF = [i % SIZE for i in range(N_CELLS)]
+BOX_OF = [(i // SIZE // BOX_SIZE) * BOX_SIZE + (i % SIZE) // BOX_SIZE for i in range(N_CELLS)]
+# Number of candidates and list of candidate digits for every candidate bitmask
+MASK_COUNT = [bin(mask).count("1") for mask in range(FULL_MASK + 1)]
+MASK_DIGITS = [[d for d in range(1, SIZE + 1) if mask & (1 << d)] for mask in range(FULL_MASK + 1)]
+
+
+def strings_to_boards(strings):
+    """Given a list of 81-character digit strings, produce an (N, 9, 9) array of boards.
+
+    Returns:
+        A tuple (boards, parsed) where parsed is a boolean array marking which strings were well-formed (exactly 81
+        digits). Boards for malformed strings are left as all zeros.
+    """
+
+    n = len(strings)
+    boards = np.zeros((n, N_CELLS), dtype=np.uint8)
+    parsed = np.array([s is not None and len(s) == N_CELLS for s in strings], dtype=bool)
+    if parsed.any():
+        # Decode all well-formed strings in a single buffer conversion
+        joined = "".join(s for s, ok in zip(strings, parsed) if ok).encode("ascii", errors="replace")
+        digits = np.frombuffer(joined, dtype=np.uint8).reshape(-1, N_CELLS) - ord("0")
+        # Reject strings containing anything other than 0-9 (unsigned wrap-around makes these > 9)
+        is_digits = (digits <= SIZE).all(axis=1)
+        rows = np.flatnonzero(parsed)
+        boards[rows[is_digits]] = digits[is_digits]
+        parsed[rows[~is_digits]] = False
+    return boards.reshape(n, SIZE, SIZE), parsed
+
+
+def boards_to_strings(boards):
+    """Given an (N, 9, 9) array of boards, return a list of 81-character digit strings."""
+
+    flat = (boards.reshape(-1, N_CELLS) + ord("0")).astype(np.uint8)
+    joined = flat.tobytes().decode("ascii")
+    return [joined[i:i + N_CELLS] for i in range(0, len(joined), N_CELLS)]
+
+
+def to_boxes(boards):
+    """Rearrange an (N, 9, 9) array of boards so that each row of the result holds one 3x3 box."""
+
+    n = boards.shape[0]
+    boxes = boards.reshape(n, BOX_SIZE, BOX_SIZE, BOX_SIZE, BOX_SIZE).transpose(0, 1, 3, 2, 4)
+    return boxes.reshape(n, SIZE, SIZE)
+
+
+def units_valid(bits, axis):
+    """Given an (N, 9, 9) array of digit bits (see DIGIT_BITS), return an (N, 9) boolean array marking which units along
+    the given axis contain each digit 1-9 exactly once."""
+
+    # A unit of 9 cells contains every digit exactly once iff the OR of its digit bits is FULL_MASK
+    return np.bitwise_or.reduce(bits, axis=axis) == FULL_MASK
+
+
+def givens_preserved(prompts, responses):
+    """Return an (N,) boolean array marking which responses keep every given (non-zero) cell of the prompt."""
+
+    return ((prompts == 0) | (prompts == responses)).all(axis=(1, 2))
+
+
+def repeated_digits(bits, axis):
+    """Given an (N, 9, 9) array of digit bits (see DIGIT_BITS), return an (N, 9) array holding, for each unit along the
+    given axis, the bitmask of digits which occur in it more than once."""
+
+    units = np.moveaxis(bits, axis, -1)
+    seen = np.zeros(units.shape[:-1], dtype=np.uint16)
+    repeated = np.zeros_like(seen)
+    # A digit repeats iff its bit is already set when a later cell of the unit is reached
+    for i in range(SIZE):
+        cell = units[..., i]
+        repeated |= seen & cell
+        seen |= cell
+    return repeated
+
+
+def cell_conflicts(boards, bits=None):
+    """Return an (N, 9, 9) boolean array marking empty cells and cells whose digit repeats in their row, column or box.
+
+    bits may be given as the digit bits of boards (see DIGIT_BITS) to avoid looking them up again.
+    """
+
+    n = boards.shape[0]
+    if bits is None:
+        bits = DIGIT_BITS[boards]
+    # Bit 0 marks empty cells, so they always conflict
+    row_mask = repeated_digits(bits, axis=2) | 1
+    col_mask = repeated_digits(bits, axis=1)
+    box_mask = repeated_digits(to_boxes(bits), axis=2)
+    # Spread each box's mask over its cells: (box row, cell row, box column, cell column)
+    masks = row_mask[:, :, None] | col_mask[:, None, :]
+    masks = masks.reshape(n, BOX_SIZE, BOX_SIZE, BOX_SIZE, BOX_SIZE) | box_mask.reshape(n, BOX_SIZE, 1, BOX_SIZE, 1)
+    return (bits & masks.reshape(n, SIZE, SIZE)) != 0
+
+
+def check_boards(prompts, responses, bits=None):
+    """Check a batch of responses against their prompts, optionally given the digit bits of responses.
+
+    Returns:
+        A dict of (N,) boolean arrays: 'givens' (all givens preserved), 'rows', 'columns' and 'boxes' (every unit
+        contains digits 1-9 exactly once) and 'solved' (all of the above).
+    """
+
+    # Look up digit bits once and reuse them for every unit type
+    if bits is None:
+        bits = DIGIT_BITS[responses]
+    checks = {
+        "givens": givens_preserved(prompts, responses),
+        "rows": units_valid(bits, axis=2).all(axis=1),
+        "columns": units_valid(bits, axis=1).all(axis=1),
+        "boxes": units_valid(to_boxes(bits), axis=2).all(axis=1),
+    }
+    checks["solved"] = checks["givens"] & checks["rows"] & checks["columns"] & checks["boxes"]
+    return checks
+
+
+def _init_masks(grid):
+    """Build row, column and box bitmasks of used digits for a flat board.
+
+    Returns:
+        A tuple (rows, cols, boxes, empties), or None if the filled cells already conflict.
+    """
+
+    rows = [0] * SIZE
+    cols = [0] * SIZE
+    boxes = [0] * SIZE
+    empties = []
+    for i, d in enumerate(grid):
+        if d == 0:
+            empties.append(i)
+            continue
+        bit = 1 << d
+        r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+        if (rows[r] | cols[c] | boxes[b]) & bit:
+            return None
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+    return rows, cols, boxes, empties
+
+
+def _search(grid, rows, cols, boxes, empties, k, limit, rng, stats):
+    """Fill empties[k:] by backtracking, always branching on the cell with the fewest candidates.
+
+    Returns the number of solutions found (at most limit). stats is a list [guesses, solution]: guesses counts branches
+    at cells with more than one candidate and solution receives a copy of the first solution found.
+    """
+
+    if k == len(empties):
+        if stats[1] is None:
+            stats[1] = grid[:]
+        return 1
+
+    # Find the empty cell with the fewest candidates
+    best_j = k
+    best_mask = 0
+    best_count = SIZE + 1
+    for j in range(k, len(empties)):
+        i = empties[j]
+        mask = FULL_MASK & ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]])
+        count = MASK_COUNT[mask]
+        if count < best_count:
+            best_j, best_mask, best_count = j, mask, count
+            if count <= 1:
+                break
+    if best_count == 0:
+        return 0
+
+    empties[k], empties[best_j] = empties[best_j], empties[k]
+    i = empties[k]
+    r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+    digits = MASK_DIGITS[best_mask]
+    if rng is not None and best_count > 1:
+        digits = digits[:]
+        rng.shuffle(digits)
+
+    found = 0
+    for d in digits:
+        if best_count > 1:
+            stats[0] += 1
+        bit = 1 << d
+        grid[i] = d
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+        found += _search(grid, rows, cols, boxes, empties, k + 1, limit - found, rng, stats)
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[b] ^= bit
+        if found >= limit:
+            break
+    grid[i] = 0
+    return found
+
+
+def solve(grid, limit=1, rng=None):
+    """Solve a flat board (list of 81 ints, 0 for empty).
+
+    Returns:
+        A tuple (n_solutions, solution, guesses): the number of solutions found (at most limit), the first solution as
+        a new list (None if unsolvable) and the number of guesses the solver made, a rough measure of difficulty.
+    """
+
+    grid = list(grid)
+    masks = _init_masks(grid)
+    if masks is None:
+        return 0, None, 0
+    rows, cols, boxes, empties = masks
+    stats = [0, None]
+    found = _search(grid, rows, cols, boxes, empties, 0, limit, rng, stats)
+    return found, stats[1], stats[0]
+
+
+def has_other_solution(puzzle, cell, digit):
+    """Return True if puzzle (with cell empty) has a solution where cell holds anything other than digit."""
+
+    grid = list(puzzle)
+    masks = _init_masks(grid)
+    if masks is None:
+        return False
+    rows, cols, boxes, empties = masks
+    empties.remove(cell)
+    return _has_other_solution(grid, rows, cols, boxes, empties, cell, digit)
+
+
+def _has_other_solution(grid, rows, cols, boxes, empties, cell, digit):
+    """As has_other_solution, on a board whose masks and empty cells (excluding cell) are already built.
+
+    grid, the masks and the set of empties are restored before returning, so callers can update them incrementally.
+    """
+
+    # Branch on the removed cell first, skipping its original digit
+    r, c, b = ROW_OF[cell], COL_OF[cell], BOX_OF[cell]
+    mask = FULL_MASK & ~(rows[r] | cols[c] | boxes[b]) & ~(1 << digit)
+    stats = [0, None]
+    for d in MASK_DIGITS[mask]:
+        bit = 1 << d
+        grid[cell] = d
+        rows[r] |= bit
+        cols[c] |= bit
+        boxes[b] |= bit
+        found = _search(grid, rows, cols, boxes, empties, 0, 1, None, stats)
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[b] ^= bit
+        if found:
+            grid[cell] = 0
+            return True
+    grid[cell] = 0
+    return False
+
+
+def generate_solution(rng):
+    """Generate a random complete board by randomized backtracking."""
+
+    return solve([0] * N_CELLS, 1, rng)[1]
+
+
+def generate_puzzle(solution, n_givens, rng):
+    """Remove clues from a complete board in random order while the puzzle keeps a unique solution.
+
+    Removal stops once n_givens clues remain or no further clue can be removed, so the result may keep more clues.
+
+    Returns:
+        The puzzle as a new flat list.
+    """
+
+    puzzle = list(solution)
+    cells = list(range(N_CELLS))
+    rng.shuffle(cells)
+    # Masks and empty cells are updated as clues are removed rather than rebuilt for every check
+    rows, cols, boxes, empties = _init_masks(puzzle)
+    givens = N_CELLS
+    for cell in cells:
+        if givens <= n_givens:
+            break
+        digit = puzzle[cell]
+        bit = 1 << digit
+        r, c, b = ROW_OF[cell], COL_OF[cell], BOX_OF[cell]
+        puzzle[cell] = 0
+        rows[r] ^= bit
+        cols[c] ^= bit
+        boxes[b] ^= bit
+        # The known solution is the only one iff no solution puts a different digit in the removed cell
+        if _has_other_solution(puzzle, rows, cols, boxes, empties, cell, digit):
+            puzzle[cell] = digit
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+        else:
+            empties.append(cell)
+            givens -= 1
+    return puzzle
\ No newline at end of file